@@ -1,2 +1,288 @@
-from fastapi import APIRouter, HTTPException, Query
-router = APIRouter()
\ No newline at end of file
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from config.settings import settings
+from models.dict_schemas import SearchResult
+from models.learn_request import LookupRequest
+from services.dictionary_service import wait_until_ready, reverse_lookup_all, \
+    autocomplete_all, dict_service_merged, reload_dictionaries, \
+    get_dictionary_version, search_definitions_all
+from services.subtitle_alignment_service import subtitle_alignment_service
+from utils.learn_cache import clear_learn_cache, get_learn_cache_stats
+from utils.transliteration_util import get_engine, list_engines, \
+    transliterate_word
+from utils.word_util import clear_word_cache, get_cache_stats
+
+router = APIRouter()
+
+
+def require_dictionaries():
+    """Wait for the dictionaries to finish loading before serving"""
+    if not wait_until_ready(settings.dict_ready_timeout_seconds):
+        raise HTTPException(status_code=503,
+                            detail="Dictionaries are still loading, try again shortly")
+
+
+def transliteration_engine(
+    transliteration: Optional[str] = Query(
+        None, description="Transliteration engine, see "
+                          "/transliteration/engines; defaults to the "
+                          "configured one")
+) -> Optional[str]:
+    """Validated per-request engine, None for the configured one"""
+    if transliteration is not None:
+        try:
+            get_engine(transliteration)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return transliteration
+
+
+def _with_transliteration(entry: Dict[str, Any],
+    engine: Optional[str]) -> Dict[str, Any]:
+    """Copy of a learning entry with its words transliterated by engine"""
+    if engine is None:
+        return entry
+    return {**entry, "word_breakdown": [
+        {**word, "transliterated": transliterate_word(word["thai"], engine)}
+        for word in entry["word_breakdown"]]}
+
+
+@router.get("/video/{video_id}", dependencies=[Depends(require_dictionaries)])
+def learn_video(video_id: str,
+    engine: Optional[str] = Depends(transliteration_engine)):
+    """Aligned Thai/English subtitles with word breakdown for a cached video"""
+    result = subtitle_alignment_service.process_video_for_learning(video_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    if engine is not None:
+        # The result may be the cached one, never modify it
+        result = {**result, "learning_entries": [
+            _with_transliteration(entry, engine)
+            for entry in result["learning_entries"]]}
+    return result
+
+
+def _ndjson_event(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/video/{video_id}/stream",
+            dependencies=[Depends(require_dictionaries)])
+def learn_video_stream(
+    video_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$",
+                                  description="ndjson or sse; defaults to sse "
+                                              "for Accept: text/event-stream"),
+    engine: Optional[str] = Depends(transliteration_engine)
+):
+    """
+    Same data as /video/{video_id}, streamed: a "summary" event, one "entry"
+    event per subtitle as soon as its words are analyzed, then "done"
+    """
+    summary, entries = \
+        subtitle_alignment_service.stream_video_for_learning(video_id)
+    if not summary["success"]:
+        raise HTTPException(status_code=404, detail=summary["error"])
+
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = "sse" if "text/event-stream" in accept else "ndjson"
+    encode = _sse_event if format == "sse" else _ndjson_event
+
+    def events():
+        yield encode("summary", summary)
+        count = 0
+        # Runs in the threadpool one entry at a time, the event loop stays free
+        for count, entry in enumerate(entries, start=1):
+            yield encode("entry", {"index": count - 1,
+                                   **_with_transliteration(entry, engine)})
+        yield encode("done", {"count": count})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse"
+        else "application/x-ndjson",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/cache/stats")
+def learn_cache_statistics():
+    """Hit rates and size of the learning result cache"""
+    return get_learn_cache_stats()
+
+
+@router.post("/cache/clear")
+def clear_learn_cache_endpoint():
+    """Drop every cached learning result"""
+    deleted_count = clear_learn_cache()
+    return {
+        "deleted_files": deleted_count,
+        "message": f"Cleared {deleted_count} cached learning results"
+    }
+
+
+@router.get("/words/cache/stats")
+def word_cache_statistics():
+    """
+    Hit rates, evictions and sizes of the analyzed word caches (of this
+    server process; learn worker processes keep their own)
+    """
+    return get_cache_stats()
+
+
+@router.post("/words/cache/clear")
+def clear_word_cache_endpoint():
+    """Drop every cached word analysis and transliteration"""
+    clear_word_cache()
+    return {"message": "Cleared word caches"}
+
+
+@router.get("/english", dependencies=[Depends(require_dictionaries)])
+def english_to_thai(
+    q: str = Query(..., min_length=1, description="English word or phrase, e.g. 'then'"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of Thai entries")
+):
+    """Reverse lookup: how do I say this English word in Thai?"""
+    entries = reverse_lookup_all(q, limit)
+    return {
+        "query": q,
+        "count": len(entries),
+        "results": [
+            {
+                "thai": entry.headword,
+                "romanization": entry.primary_romanization,
+                "english": entry.primary_english,
+                "category": entry.category,
+                "freq_rank": entry.freq_rank,
+                "source": entry.csv_type,
+            }
+            for entry in entries
+        ]
+    }
+
+
+@router.get("/autocomplete", dependencies=[Depends(require_dictionaries)])
+def autocomplete(
+    q: str = Query(..., min_length=1, description="Prefix of a Thai word or its romanization"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    ranked: bool = Query(True, description="Most frequent words first instead of alphabetical")
+):
+    """As-you-type suggestions over Thai headwords and romanizations"""
+    entries = autocomplete_all(q, limit, ranked)
+    return {
+        "query": q,
+        "count": len(entries),
+        "suggestions": [
+            {
+                "thai": entry.headword,
+                "romanization": entry.primary_romanization,
+                "english": entry.primary_english,
+                "freq_rank": entry.freq_rank,
+            }
+            for entry in entries
+        ]
+    }
+
+
+@router.get("/definitions", dependencies=[Depends(require_dictionaries)])
+def search_definitions(
+    q: str = Query(..., min_length=1, description="Thai text to find in definitions and sample sentences"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of entries")
+):
+    """Full-text search over Thai definitions (needs DICT_ENGINE=sqlite)"""
+    try:
+        entries = search_definitions_all(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return {
+        "query": q,
+        "count": len(entries),
+        "results": [
+            {
+                "thai": entry.headword,
+                "english": entry.primary_english,
+                "definition": entry.t_def,
+                "sample": entry.primary_sample,
+                "category": entry.category,
+                "source": entry.csv_type,
+            }
+            for entry in entries
+        ]
+    }
+
+
+@router.post("/lookup", dependencies=[Depends(require_dictionaries)])
+def lookup_words(request: LookupRequest):
+    """Resolve a batch of Thai words (e.g. a whole subtitle screen) in one call"""
+    if request.transliteration is not None:
+        try:
+            get_engine(request.transliteration)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    records = dict_service_merged.lookup_many(request.words)
+    results = {}
+    for word, record in records.items():
+        if record is None:
+            results[word] = {"found": False, "english_translations": [],
+                             "categories": [], "romanization": None}
+            continue
+        entries = record.entries
+        results[word] = {
+            "found": True,
+            "english_translations": list(record.english_translations),
+            "categories": SearchResult(word=word, entries=entries
+                                       ).get_grammatical_category(),
+            "romanization": next((entry.primary_romanization for entry in entries
+                                  if entry.primary_romanization), None),
+        }
+    if request.transliteration is not None:
+        for word, result in results.items():
+            result["transliterated"] = transliterate_word(
+                word, request.transliteration)
+    return {
+        "count": len(results),
+        "found": sum(1 for result in results.values() if result["found"]),
+        "results": results,
+    }
+
+
+@router.get("/transliteration/engines")
+def transliteration_engines():
+    """Registered transliteration engines and whether each can run here"""
+    return {"engines": list_engines()}
+
+
+@router.get("/transliterate")
+def transliterate_text(
+    q: str = Query(..., min_length=1, description="Thai word or phrase"),
+    engine: Optional[str] = Depends(transliteration_engine)
+):
+    """Transliterate text with any available engine"""
+    return {"text": q, "engine": engine or get_engine().name,
+            "transliterated": transliterate_word(q.strip(), engine)}
+
+
+@router.post("/dictionaries/reload")
+def reload_dictionary_files(
+    force: bool = Query(False, description="Rebuild even if no CSV changed")
+):
+    """Hot reload changed dictionary CSVs; lookups keep serving meanwhile"""
+    try:
+        reloaded = reload_dictionaries(force)
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f"Dictionary reload failed: {e}")
+    return {
+        "reloaded": [name for name, changed in reloaded.items() if changed],
+        "version": get_dictionary_version(),
+    }
@@ -0,0 +1,72 @@
+"""
+Load-time and memory report for every configured dictionary file.
+
+For each CSV it measures streaming the rows into DictionaryEntry objects,
+building the DictionaryIndex on top, and loading the finished index back
+from its snapshot. Memory is what tracemalloc still holds after each stage.
+
+Run from the backend directory:
+    python -m benchmarks.dict_load [csv_path ...]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from config.settings import settings
+from utils.dict_index import DictionaryIndex
+from utils.dict_snapshot import build_snapshot, load_snapshot
+from utils.dict_util import load_dictionary_from_file
+
+_MB = 1024 * 1024
+
+
+def load_report(csv_path: str) -> dict:
+    """Measure parse, index and snapshot load cost for one dictionary file"""
+    gc.collect()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    entries = load_dictionary_from_file(csv_path)
+    parse_seconds = time.perf_counter() - start
+    entries_bytes, parse_peak = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    index = DictionaryIndex(entries)
+    index_seconds = time.perf_counter() - start
+    total_bytes, index_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del index, entries
+    gc.collect()
+    build_snapshot(csv_path)
+    start = time.perf_counter()
+    snapshot = load_snapshot(csv_path)
+    snapshot_seconds = time.perf_counter() - start
+
+    entry_count = len(snapshot[0].entries) if snapshot else 0
+    return {
+        "file": csv_path,
+        "entries": entry_count,
+        "parse_seconds": round(parse_seconds, 3),
+        "index_seconds": round(index_seconds, 3),
+        "snapshot_seconds": round(snapshot_seconds, 3),
+        "entries_mb": round(entries_bytes / _MB, 2),
+        "index_mb": round((total_bytes - entries_bytes) / _MB, 2),
+        "peak_mb": round(max(parse_peak, index_peak) / _MB, 2),
+    }
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [settings.dict_file_freq, settings.dict_file_full,
+                             settings.dict_file_telex,
+                             settings.dict_file_lexitron]
+    for path in paths:
+        report = load_report(path)
+        print(f"{report['file']}: {report['entries']} entries")
+        print(f"  parse   : {report['parse_seconds']:6.2f}s "
+              f"{report['entries_mb']:8.2f} MB")
+        print(f"  index   : {report['index_seconds']:6.2f}s "
+              f"{report['index_mb']:8.2f} MB")
+        print(f"  snapshot: {report['snapshot_seconds']:6.2f}s "
+              f"(peak while building {report['peak_mb']:.2f} MB)")
@@ -0,0 +1,87 @@
+"""
+Memory report: legacy vs compact DictionaryEntry layout.
+
+The legacy layout is the original frozen dataclass without __slots__, where
+every row owns its own copy of category/domain strings. The compact layout is
+the current slotted DictionaryEntry with interned low-cardinality strings.
+
+Run from the backend directory:
+    python -m benchmarks.dict_memory [csv_path ...]
+"""
+import dataclasses
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple, Any
+
+from config.settings import settings
+from models.dict_schemas import DictionaryEntry
+from utils.dict_util import load_dictionary_from_file
+
+# Original layout, rebuilt from the current field list
+LegacyDictionaryEntry = dataclasses.make_dataclass(
+    "LegacyDictionaryEntry",
+    [(f.name, f.type, dataclasses.field(default=f.default))
+     for f in dataclasses.fields(DictionaryEntry)],
+    frozen=True,
+)
+
+_FIELD_NAMES = [f.name for f in dataclasses.fields(DictionaryEntry)]
+
+
+def _copy_value(value: Any) -> Any:
+    """Give each row its own value object, like the un-interned parser did"""
+    if isinstance(value, str) and value:
+        return (value + ".")[:-1]
+    if isinstance(value, (int, float)):
+        return type(value)(str(value))
+    return value
+
+
+def _measure(build: Callable[[], List[Any]]) -> Tuple[List[Any], int, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def memory_report(csv_path: str) -> dict:
+    """Measure memory held by one dictionary file in both layouts"""
+    entries, compact_bytes, load_seconds = _measure(
+        lambda: load_dictionary_from_file(csv_path))
+
+    def build_legacy():
+        return [
+            LegacyDictionaryEntry(
+                *(_copy_value(getattr(entry, name)) for name in _FIELD_NAMES))
+            for entry in entries
+        ]
+
+    _, legacy_bytes, _ = _measure(build_legacy)
+
+    return {
+        "file": csv_path,
+        "entries": len(entries),
+        "load_seconds": round(load_seconds, 3),
+        "legacy_mb": round(legacy_bytes / (1024 * 1024), 2),
+        "compact_mb": round(compact_bytes / (1024 * 1024), 2),
+        "saved_pct": round(100 * (1 - compact_bytes / legacy_bytes), 1)
+        if legacy_bytes else 0.0,
+        "legacy_bytes_per_entry": legacy_bytes // max(len(entries), 1),
+        "compact_bytes_per_entry": compact_bytes // max(len(entries), 1),
+    }
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [settings.dict_file_freq, settings.dict_file_full]
+    for path in paths:
+        report = memory_report(path)
+        print(f"{report['file']}: {report['entries']} entries")
+        print(f"  legacy : {report['legacy_mb']:8.2f} MB "
+              f"({report['legacy_bytes_per_entry']} B/entry)")
+        print(f"  compact: {report['compact_mb']:8.2f} MB "
+              f"({report['compact_bytes_per_entry']} B/entry)")
+        print(f"  saved  : {report['saved_pct']}%")
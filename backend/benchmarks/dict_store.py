@@ -0,0 +1,66 @@
+"""
+Per-worker memory: private merged index vs the shared memory-mapped store.
+
+Each mode runs in a fresh subprocess (like a new uvicorn/gunicorn worker),
+loads the merged dictionary, resolves a batch of words and reports its
+resident memory from /proc/self/status (Linux only). RssAnon is memory
+private to the worker; RssFile is file-backed pages, which for the store
+are shared with every other process mapping it.
+
+Run from the backend directory:
+    python -m benchmarks.dict_store [words]
+"""
+import json
+import subprocess
+import sys
+
+_WORKER = """
+import json, sys, time
+from config.settings import settings
+settings.dict_shared_store = sys.argv[1] == "shared"
+from services.dictionary_service import dict_service_merged
+
+def rss():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+before = rss()
+start = time.perf_counter()
+dict_service_merged.ensure_loaded()
+load_seconds = time.perf_counter() - start
+words = list(dict_service_merged.index.records)[:int(sys.argv[2])]
+start = time.perf_counter()
+dict_service_merged.get_translations_many(words)
+lookup_seconds = time.perf_counter() - start
+after = rss()
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "lookup_us": lookup_seconds / max(len(words), 1) * 1e6,
+    **{name: after[name] - before.get(name, 0) for name in after},
+}))
+"""
+
+
+def worker_report(mode: str, words: int) -> dict:
+    """Run one fresh worker process in the given mode and parse its report"""
+    output = subprocess.run([sys.executable, "-c", _WORKER, mode, str(words)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # Warm up snapshots and the store so both modes measure a steady state
+    for mode in ("private", "shared"):
+        worker_report(mode, 1)
+    for mode in ("private", "shared"):
+        report = worker_report(mode, words)
+        print(f"{mode:8}: RssAnon {report['RssAnon']:7.1f} MB, "
+              f"RssFile {report['RssFile']:6.1f} MB, "
+              f"load {report['load_seconds']:.2f}s, "
+              f"{report['lookup_us']:.1f} us/word")
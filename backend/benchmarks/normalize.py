@@ -0,0 +1,72 @@
+"""
+Query normalization cost on real subtitle tokens.
+
+Tokenizes every saved Thai transcript (as the learning pipeline does) and
+normalizes the tokens with the original five-pass normalizer, with the
+fast-path normalize_search_term and with the memoized normalize_query.
+The token stream is repeated to stand in for the same words coming back
+across lines and videos. All three must produce identical keys.
+
+Run from the backend directory:
+    python -m benchmarks.normalize [repeat]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from pythainlp.tokenize import word_tokenize
+from pythainlp.util import normalize
+
+from config.settings import settings
+from utils.dict_util import normalize_query, normalize_search_term, \
+    _normalize_text_full
+
+
+def load_subtitle_tokens() -> List[str]:
+    """Tokens of every cached Thai transcript, in subtitle order"""
+    tokens = []
+    for path in sorted(Path(settings.transcript_temp_dir).glob("*/*_Thai.json")):
+        with open(path, encoding="utf-8") as f:
+            lines = json.load(f).get("transcript_data", [])
+        for line in lines:
+            tokens.extend(word_tokenize(normalize(line["text"]),
+                                        keep_whitespace=False))
+    return tokens
+
+
+def _five_pass(term: str) -> str:
+    normalized = _normalize_text_full(term) if term else None
+    return normalized.lower() if normalized else ""
+
+
+def time_normalizer(normalizer: Callable[[str], str], tokens: List[str]) -> \
+    tuple:
+    """Seconds to normalize every token, and the resulting keys"""
+    start = time.perf_counter()
+    keys = [normalizer(token) for token in tokens]
+    return time.perf_counter() - start, keys
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    corpus = load_subtitle_tokens()
+    if not corpus:
+        sys.exit(f"No Thai transcripts under {settings.transcript_temp_dir}")
+    tokens = corpus * repeat
+    print(f"{len(corpus)} tokens ({len(set(corpus))} distinct) "
+          f"x {repeat} = {len(tokens)} lookups")
+
+    normalize_query.cache_clear()
+    _, expected = time_normalizer(_five_pass, tokens)  # Warm-up
+    baseline = None
+    for name, normalizer in (("five-pass", _five_pass),
+                             ("fast path", normalize_search_term),
+                             ("memoized", normalize_query)):
+        seconds, keys = time_normalizer(normalizer, tokens)
+        baseline = baseline or seconds
+        status = "ok" if keys == expected else "MISMATCH"
+        print(f"  {name:9}: {seconds * 1000:7.1f} ms "
+              f"{seconds / len(tokens) * 1e9:6.0f} ns/token "
+              f"x{baseline / seconds:4.1f} ({status})")
@@ -0,0 +1,110 @@
+"""
+Accuracy of the romanizer against the frequency dictionary's IPA.
+
+The freq_ipa column of the frequency dictionary is a tonal IPA transcription
+made independently of utils.thai_romanizer. Each transcription is converted
+syllable by syllable into the romanizer's spelling (same consonant and vowel
+letters, same tone accents) and compared with the romanizer's output for the
+headword, most frequent words first. The converter never looks at the Thai
+spelling, so it can be used to verify entries of data/romanizer_golden.tsv.
+
+Run from the backend directory:
+    python -m benchmarks.romanizer [word_limit] [mismatches_to_show]
+"""
+import sys
+import unicodedata
+from typing import List, Optional, Tuple
+
+from config.settings import settings
+from utils.dict_util import load_dictionary_from_file
+from utils.thai_romanizer import romanize_words, set_overrides, \
+    spell_syllable
+
+# Longest first, so tɕʰ wins over tɕ
+_IPA_INITIALS = (
+    ("tɕʰ", "ch"), ("tɕ", "j"), ("pʰ", "ph"), ("tʰ", "th"), ("kʰ", "kh"),
+    ("p", "bp"), ("t", "dt"), ("k", "g"), ("b", "b"), ("d", "d"),
+    ("m", "m"), ("n", "n"), ("ŋ", "ng"), ("f", "f"), ("s", "s"), ("h", "h"),
+    ("r", "r"), ("l", "l"), ("w", "w"), ("j", "y"), ("ʔ", ""),
+)
+# Short and long spelling of each vowel
+_IPA_VOWELS = {
+    "a": ("a", "aa"), "i": ("i", "ii"), "u": ("u", "uu"), "ɯ": ("ue", "uee"),
+    "e": ("e", "ee"), "o": ("o", "oo"), "ɛ": ("ae", "ae"),
+    "ɔ": ("or", "or"), "ɤ": ("er", "er"),
+}
+_IPA_DIPHTHONGS = {"i": "ia", "ɯ": "uea", "u": "ua"}
+_IPA_FINALS = {"": "", "p": "p", "t": "t", "k": "k", "ʔ": "", "m": "m",
+               "n": "n", "ŋ": "ng", "j": "y", "w": "w"}
+_IPA_TONES = {"̀": "L", "́": "H", "̂": "F", "̌": "R"}
+
+
+def _ipa_syllable(syllable: str) -> Optional[str]:
+    tone = "M"
+    letters = ""
+    for ch in unicodedata.normalize("NFD", syllable):
+        if ch in _IPA_TONES:
+            tone = _IPA_TONES[ch]
+        else:
+            letters += ch
+    for ipa, initial in _IPA_INITIALS:
+        if letters.startswith(ipa):
+            rest = letters[len(ipa):]
+            break
+    else:
+        return None
+    if rest[:1] in ("r", "l", "w") and rest[1:2] in _IPA_VOWELS:
+        initial += {"r": "r", "l": "l", "w": "w"}[rest[0]]
+        rest = rest[1:]
+    if rest[:1] not in _IPA_VOWELS:
+        return None
+    letter = rest[0]
+    is_long = rest[1:2] == "ː"
+    rest = rest[1 + is_long:]
+    vowel = _IPA_VOWELS[letter][is_long]
+    if rest[:1] == "a" and letter in _IPA_DIPHTHONGS:
+        # iːa / ia, ɯːa, uːa
+        vowel = _IPA_DIPHTHONGS[letter]
+        rest = rest[1:]
+    if rest not in _IPA_FINALS:
+        return None
+    return spell_syllable(initial, vowel, _IPA_FINALS[rest], tone)
+
+
+def ipa_to_romanization(ipa: str) -> Optional[str]:
+    """Romanizer-style spelling of an IPA transcription, None if unparsable"""
+    syllables = [_ipa_syllable(syllable) for syllable in ipa.split()]
+    if not syllables or None in syllables:
+        return None
+    return " ".join(syllables)
+
+
+def load_transcriptions(limit: int) -> List[Tuple[str, str, str]]:
+    """(word, IPA, expected romanization), most frequent words first"""
+    entries = load_dictionary_from_file(settings.dict_file_freq, "freq")
+    entries.sort(key=lambda entry: entry.freq_rank or sys.maxsize)
+    found = {}
+    for entry in entries:
+        if entry.t_word and entry.freq_ipa and entry.t_word not in found:
+            expected = ipa_to_romanization(entry.freq_ipa)
+            if expected is not None:
+                found[entry.t_word] = (entry.t_word, entry.freq_ipa, expected)
+    return list(found.values())[:limit]
+
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    show = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    set_overrides({})
+    transcriptions = load_transcriptions(limit)
+    actual = romanize_words(word for word, _, _ in transcriptions)
+    mismatches = [(word, ipa, expected, result)
+                  for (word, ipa, expected), result in zip(transcriptions,
+                                                           actual)
+                  if result != expected]
+    total = len(transcriptions)
+    print(f"{total - len(mismatches)}/{total} words match the IPA of "
+          f"{settings.dict_file_freq} "
+          f"({(total - len(mismatches)) / max(total, 1):.1%})")
+    for word, ipa, expected, result in mismatches[:show]:
+        print(f"  {word} /{ipa}/: expected {expected!r}, got {result!r}")
@@ -0,0 +1,83 @@
+"""
+Transliteration engines on the frequency-list vocabulary.
+
+For every available engine (or the ones named on the command line):
+    cold start  seconds to import the registry (pythainlp included) and
+                transliterate one word with the engine,
+                in a fresh interpreter
+    memory      peak RSS that import and first word add to that interpreter
+    throughput  words/sec over the distinct headwords of the frequency
+                dictionary, uncached (engine.transliterate is called
+                directly, bypassing the per-engine caches)
+
+Run from the backend directory:
+    python -m benchmarks.transliteration [word_limit] [engine ...]
+"""
+import json
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from config.settings import settings
+from utils.dict_util import load_dictionary_from_file
+from utils.transliteration_util import get_engine, is_engine_available, \
+    list_engines
+
+_THAI = re.compile(r"[\u0E00-\u0E7F]")
+
+# Runs in a fresh interpreter; prints seconds and peak RSS growth (KB)
+_COLD_START = """
+import json, resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+from utils.transliteration_util import get_engine
+get_engine(sys.argv[1]).transliterate("สวัสดี")
+seconds = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": seconds, "rss_kb": after - before}))
+"""
+
+
+def load_vocabulary(limit: int) -> List[str]:
+    """Distinct Thai headwords of the frequency dictionary, most frequent first"""
+    entries = load_dictionary_from_file(settings.dict_file_freq, "freq")
+    entries.sort(key=lambda entry: entry.freq_rank or sys.maxsize)
+    words = dict.fromkeys(entry.t_word for entry in entries
+                          if entry.t_word and _THAI.search(entry.t_word))
+    return list(words)[:limit]
+
+
+def measure_cold_start(engine: str) -> Dict[str, float]:
+    output = subprocess.run([sys.executable, "-c", _COLD_START, engine],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_throughput(engine: str, words: List[str]) -> float:
+    """Uncached words per second (after one warm-up word)"""
+    transliterate = get_engine(engine).transliterate
+    transliterate("สวัสดี")
+    start = time.perf_counter()
+    for word in words:
+        transliterate(word)
+    return len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    engines = sys.argv[2:] or [engine["name"] for engine in list_engines()]
+    words = load_vocabulary(limit)
+    print(f"{len(words)} distinct words from {settings.dict_file_freq}")
+    print(f"  {'engine':10} {'cold start':>10} {'memory':>9} {'words/sec':>10}"
+          f"  sample")
+    for engine in engines:
+        if not is_engine_available(engine):
+            print(f"  {engine:10} (unavailable)")
+            continue
+        cold = measure_cold_start(engine)
+        rate = measure_throughput(engine, words)
+        sample = get_engine(engine).transliterate(words[0]) if words else ""
+        print(f"  {engine:10} {cold['seconds']:9.3f}s "
+              f"{cold['rss_kb'] / 1024:7.1f}MB {rate:10.0f}  {sample}")
@@ -24,12 +24,109 @@ class Settings(BaseSettings):
     # Dictionary Configuration
     dict_file_freq: str = "./data/thai-freq-matches.csv"
     dict_file_full: str = "./data/thai-smart-matches.csv"
+    dict_file_telex: str = "./data/thai-eng-telex.csv"
+    dict_file_lexitron: str = "./data/thai-eng-lexitron.csv"
+    # Load Telex and LEXiTRON as extra, lower-priority dictionaries. They add
+    # about 465 MB per process, so with several workers pair this with
+    # dict_shared_store or the sqlite engine
+    dict_load_extra: bool = False
+    dict_snapshot_enabled: bool = True
+    dict_snapshot_dir: str = "./data/snapshots"
+    dict_preload: bool = True  # Load in background threads at startup
+    dict_ready_timeout_seconds: float = 30.0
+    # Processes used to parse a dictionary CSV when no snapshot can be used;
+    # 0 means one per CPU, 1 parses in the loading thread
+    dict_load_workers: int = 0
+    # Poll the dictionary CSVs and hot reload them on change; 0 disables
+    dict_watch_interval_seconds: float = 0.0
+    # Serve the merged dictionary from one memory-mapped file shared by all
+    # worker processes instead of a private copy per worker
+    dict_shared_store: bool = False
+    # Dictionary storage: "memory" (indexes in RAM) or "sqlite" (on-disk
+    # database per dictionary, low RAM, adds full-text definition search)
+    dict_engine: str = "memory"
+    # Typo-tolerant lookup; the word analysis fallback is off by default
+    # because near-misses on short or compound words are often wrong
+    dict_fuzzy_fallback: bool = False
+    dict_fuzzy_max_distance: int = 1
+    dict_fuzzy_min_length: int = 5
+
+    # Processes analyzing subtitle words in parallel; 1 analyzes in the
+    # request thread, 0 means one per CPU. Every worker loads its own
+    # dictionaries, so pair this with dict_shared_store or the sqlite engine.
+    learn_workers: int = 1
+    # Subtitle lines sent to a worker per round trip
+    learn_chunk_size: int = 8
+
+    # Transliteration engine of analyzed words (see
+    # utils/transliteration_util.py; endpoints can pick another per request).
+    # If it cannot run, e.g. PyICU is missing, the pure-Python "romanizer"
+    # is used instead and a warning is logged
+    transliteration_engine: str = "icu"
+    # JSON object of word -> romanization for the "romanizer" engine
+    romanizer_overrides_file: Optional[str] = None
+
+    # Analyzed words and transliterations kept in memory per process
+    # (least recently used evicted first); a TTL of 0 never expires them
+    word_cache_size: int = 50000
+    word_cache_shards: int = 16
+    word_cache_ttl_seconds: float = 0.0
+
+    # Analyzed words also persisted in a SQLite database in the snapshot
+    # directory, shared by worker processes and kept across restarts;
+    # with seed, the memory caches are filled from it at startup. Words of
+    # versions (dictionary, engine) no process has used for max_age_days
+    # are pruned at startup
+    word_store_enabled: bool = True
+    word_store_seed: bool = True
+    word_store_max_age_days: float = 7.0
+
+    # Learning results cached per video on disk (inside the transcript
+    # directory), with an in-memory LRU of the most recent videos in front
+    learn_cache_enabled: bool = True
+    learn_cache_memory_items: int = 128
 
     @field_validator('transcript_temp_dir')
     def validate_temp_dir(cls, v):
         # Ensure path is absolute for consistency
         return str(Path(v).resolve())
 
+    @field_validator('dict_engine')
+    def validate_dict_engine(cls, v):
+        if v not in ('memory', 'sqlite'):
+            raise ValueError('Dictionary engine must be "memory" or "sqlite"')
+        return v
+
+    @field_validator('dict_load_workers')
+    def validate_dict_load_workers(cls, v):
+        if v < 0:
+            raise ValueError('Dictionary load workers cannot be negative')
+        return v
+
+    @field_validator('learn_workers')
+    def validate_learn_workers(cls, v):
+        if v < 0:
+            raise ValueError('Learn workers cannot be negative')
+        return v
+
+    @field_validator('learn_chunk_size')
+    def validate_learn_chunk_size(cls, v):
+        if v < 1:
+            raise ValueError('Learn chunk size must be at least 1')
+        return v
+
+    @field_validator('word_cache_size', 'word_cache_ttl_seconds')
+    def validate_word_cache_limits(cls, v):
+        if v < 0:
+            raise ValueError('Word cache size and TTL cannot be negative')
+        return v
+
+    @field_validator('word_cache_shards')
+    def validate_word_cache_shards(cls, v):
+        if v < 1:
+            raise ValueError('Word cache shards must be at least 1')
+        return v
+
     @field_validator('transcript_retention_days')
     def validate_retention_days(cls, v):
         if v < 1:
@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from api.routes import captions,learn
 from config.settings import settings
+import threading
 import uvicorn
 
-from services.dictionary_service import dict_service
+from services.dictionary_service import start_background_loading, \
+    get_readiness, start_file_watcher, stop_file_watcher, wait_until_ready
+from services.subtitle_alignment_service import subtitle_alignment_service, \
+    get_learn_workers, start_learn_workers, stop_learn_workers
+from utils.transliteration_util import check_default_engine
+from utils.word_util import seed_word_cache
 
 app = FastAPI(title=settings.api_title, version=settings.api_version)
 
@@ -21,9 +28,40 @@ app.add_middleware(
 app.include_router(captions.router, prefix="/captions", tags=["captions"])
 app.include_router(learn.router, prefix="/learn", tags=["learn"])
 
+
+def _start_learn_workers():
+    # Workers load the same dictionaries, start them once ours are ready
+    if wait_until_ready(None):
+        start_learn_workers()
+
+
+def _seed_word_cache():
+    # Stored words are keyed by dictionary version, known once loaded
+    if wait_until_ready(None):
+        count = seed_word_cache(prune=True)
+        print(f"Word cache seeded with {count} stored words")
+
+
 @app.on_event("startup")
 async def startup_event():
-    dict_service.load_dictionary_from_file()
+    # Logs a warning (and falls back) if the configured engine cannot run
+    check_default_engine()
+    # Don't block startup: /captions can serve while dictionaries load
+    if settings.dict_preload:
+        start_background_loading()
+        threading.Thread(target=subtitle_alignment_service.warm_up,
+                         daemon=True).start()
+        if settings.word_store_seed:
+            threading.Thread(target=_seed_word_cache, daemon=True).start()
+        if get_learn_workers() > 1:
+            threading.Thread(target=_start_learn_workers, daemon=True).start()
+    start_file_watcher()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_file_watcher()
+    stop_learn_workers()
 
 
 @app.get("/")
@@ -36,10 +74,21 @@ def root():
 
 
 @app.get("/health")
+@app.get("/health/live")
 async def health():
+    """Liveness: the process is up and serving requests"""
     return {"status": "ok"}
 
 
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: all dictionaries are loaded"""
+    readiness = get_readiness()
+    readiness["status"] = "ready" if readiness["ready"] else "loading"
+    return JSONResponse(content=readiness,
+                        status_code=200 if readiness["ready"] else 503)
+
+
 # --- Run with: uvicorn main:app --reload ---
 if __name__ == "__main__":
     uvicorn.run(
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Iterator
+from typing import Optional, Dict, List, Iterator, Tuple, Sequence
+import re
+import sys
 import unicodedata
 
+# Parenthetical notes in LEXiTRON Thai glosses, e.g. "(เล่นดนตรี) คลอไปด้วย"
+_PAREN_RE = re.compile(r"\s*\([^()]*\)\s*")
+# Sense numbers on LEXiTRON English headwords, e.g. "mean1", "cool2"
+_SENSE_NUMBER_RE = re.compile(r"(?<=[A-Za-z])\d+$")
+
 
 def _nz(s: Optional[str]) -> Optional[str]:
     """Normalize and return None for empty strings."""
@@ -17,7 +24,23 @@ def _nz(s: Optional[str]) -> Optional[str]:
     return unicodedata.normalize("NFC", s)
 
 
-@dataclass(frozen=True)
+# DictionaryEntry fields whose values are interned by the parsers
+_INTERNED_FIELDS = frozenset({'dict_category', 'rom_category', 'etymology',
+                              'domain', 'match_type', 'source'})
+# DictionaryEntry fields that are not strings, by type; storage engines that
+# keep values as text convert them back with it
+_NUMERIC_FIELDS = {'id': int, 'freq_rank': int, 'frequency': int,
+                   'match_score': float, 'smart_match_id': int,
+                   'dict_id': int, 'rom_id': int}
+
+
+def _nzi(s: Optional[str]) -> Optional[str]:
+    """Normalize and intern low-cardinality values (categories, domains)."""
+    s = _nz(s)
+    return sys.intern(s) if s is not None else None
+
+
+@dataclass(frozen=True, slots=True)
 class DictionaryEntry:
     # Core identification
     id: int
@@ -74,6 +97,9 @@ class DictionaryEntry:
     dict_id: Optional[int] = field(default=None)  # Original dict ID
     rom_id: Optional[int] = field(default=None)  # Original rom ID
 
+    # Source dictionary for the extra Thai-English files ("telex", "lexitron")
+    source: Optional[str] = field(default=None)
+
     @property
     def headword(self) -> Optional[str]:
         """Main Thai headword"""
@@ -115,6 +141,8 @@ class DictionaryEntry:
         """Determine which CSV type this entry came from"""
         if self.freq_rank is not None:
             return "frequency_4000"
+        elif self.source is not None:
+            return self.source
         else:
             return "full_dictionary"
 
@@ -158,8 +186,8 @@ class DictionaryEntry:
             rom_id=to_int_or_none(row.get("rom_id")),
             e_dict=_nz(row.get("e_dict")),
             e_dict_v=_nz(row.get("e_dict_v")),
-            dict_category=_nz(row.get("dict_category")),
-            rom_category=_nz(row.get("rom_category")),
+            dict_category=_nzi(row.get("dict_category")),
+            rom_category=_nzi(row.get("rom_category")),
             romanization=_nz(row.get("romanization")),
             phonetic=_nz(row.get("phonetic")),
             sample_sentence=_nz(row.get("sample_sentence")),
@@ -167,9 +195,9 @@ class DictionaryEntry:
             t_syn=_nz(row.get("t_syn")),
             t_ant=_nz(row.get("t_ant")),
             e_related=_nz(row.get("e_related")),
-            etymology=_nz(row.get("etymology")),
-            domain=_nz(row.get("domain")),
-            match_type=_nz(row.get("match_type"))
+            etymology=_nzi(row.get("etymology")),
+            domain=_nzi(row.get("domain")),
+            match_type=_nzi(row.get("match_type"))
         )
 
     @staticmethod
@@ -205,8 +233,8 @@ class DictionaryEntry:
             t_word=_nz(row.get("t_word")),
             e_dict_v=_nz(row.get("e_dict_v")),
             rom_english=_nz(row.get("rom_english")),
-            dict_category=_nz(row.get("dict_category")),
-            rom_category=_nz(row.get("rom_category")),
+            dict_category=_nzi(row.get("dict_category")),
+            rom_category=_nzi(row.get("rom_category")),
             romanization=_nz(row.get("romanization")),
             phonetic=_nz(row.get("phonetic")),
             match_score=to_float_or_none(row.get("match_score")),
@@ -215,9 +243,9 @@ class DictionaryEntry:
             t_syn=_nz(row.get("t_syn")),
             t_ant=_nz(row.get("t_ant")),
             e_related=_nz(row.get("e_related")),
-            etymology=_nz(row.get("etymology")),
-            domain=_nz(row.get("domain")),
-            match_type=_nz(row.get("match_type"))
+            etymology=_nzi(row.get("etymology")),
+            domain=_nzi(row.get("domain")),
+            match_type=_nzi(row.get("match_type"))
         )
 
     @staticmethod
@@ -231,6 +259,55 @@ class DictionaryEntry:
         else:
             return DictionaryEntry.from_full_csv_row(row)
 
+    @staticmethod
+    def from_telex_csv_row(row: Sequence[str],
+        columns: Dict[str, int]) -> "DictionaryEntry":
+        """
+        Create entry from a positional Telex CSV row (Thai -> English)
+        Format: id,t-search,t-entry,e-entry,t-cat,t-syn,t-sample,t-ant,t-def,
+               e-related,t-num,notes
+        t-entry may carry a sense number ("แป้น 1"), so t-search is the headword.
+        """
+        return DictionaryEntry(
+            id=int(row[columns["id"]]),
+            t_word=_nz(row[columns["t-search"]]) or _nz(row[columns["t-entry"]]),
+            e_dict=_nz(row[columns["e-entry"]]),
+            dict_category=_nzi(row[columns["t-cat"]]),
+            t_syn=_nz(row[columns["t-syn"]]),
+            t_sample_sentence=_nz(row[columns["t-sample"]]),
+            t_ant=_nz(row[columns["t-ant"]]),
+            t_def=_nz(row[columns["t-def"]]),
+            e_related=_nz(row[columns["e-related"]]),
+            source="telex",
+        )
+
+    @staticmethod
+    def from_lexitron_csv_row(row: Sequence[str],
+        columns: Dict[str, int]) -> "DictionaryEntry":
+        """
+        Create entry from a positional LEXiTRON CSV row (English -> Thai)
+        Format: id,e-search,e-entry,t-entry,e-cat,t-related,e-syn,e-ant
+        The Thai gloss becomes the headword; parenthetical notes are dropped
+        from it and the full gloss is kept as t_def. Sense numbers are
+        dropped from the English headword ("mean1" -> "mean").
+        """
+        t_entry = _nz(row[columns["t-entry"]])
+        t_word = t_entry
+        t_def = None
+        if t_entry and "(" in t_entry:
+            t_word = _nz(_PAREN_RE.sub(" ", t_entry)) or t_entry
+            t_def = t_entry
+        return DictionaryEntry(
+            id=int(row[columns["id"]]),
+            t_word=t_word,
+            t_def=t_def,
+            e_dict=_nz(_SENSE_NUMBER_RE.sub("", row[columns["e-entry"]].strip())),
+            dict_category=_nzi(row[columns["e-cat"]]),
+            t_syn=_nz(row[columns["t-related"]]),
+            e_related=_nz(row[columns["e-syn"]]),
+            source="lexitron",
+        )
+
 
 @dataclass
 class SearchResult:
@@ -240,6 +317,9 @@ class SearchResult:
     """
     word: str  # The normalized search term
     entries: List[DictionaryEntry] = field(default_factory=list)
+    # Precomputed summaries when the entries are exactly one indexed headword
+    record: Optional[HeadwordRecord] = field(default=None, repr=False,
+                                             compare=False)
 
     @property
     def count(self) -> int:
@@ -270,6 +350,8 @@ class SearchResult:
 
     def get_english_translations(self) -> List[str]:
         """Get all unique English translations"""
+        if self.record is not None:
+            return list(self.record.english_translations)
         translations = set()
         for entry in self.entries:
             if entry.e_dict is not None:
@@ -282,6 +364,8 @@ class SearchResult:
 
     def get_grammatical_category(self) -> List[str]:
         """Get all grammatical category for this word"""
+        if self.record is not None:
+            return list(self.record.categories)
         cat_set = set()
         for entry in self.entries:
             if entry.category:
@@ -290,6 +374,8 @@ class SearchResult:
 
     def group_by_pos(self) -> Dict[str, List[DictionaryEntry]]:
         """Group entries by part of speech."""
+        if self.record is not None:
+            return self.record.group_by_pos()
         groups = defaultdict(list)
         for entry in self.entries:
             pos = entry.category or "UNKNOWN"
@@ -309,6 +395,74 @@ class SearchResult:
         return len(self.entries) > 0
 
 
+@dataclass(frozen=True, slots=True)
+class HeadwordRecord:
+    """
+    One normalized headword of a dictionary with its entries (sorted by ID)
+    and the SearchResult summaries, computed once when the index is built
+    """
+    headword: str
+    entries: Tuple[DictionaryEntry, ...]
+    english_translations: Tuple[str, ...]
+    categories: Tuple[str, ...]
+    pos_groups: Tuple[Tuple[str, Tuple[DictionaryEntry, ...]], ...]
+
+    @staticmethod
+    def from_entries(headword: str, entries: List[DictionaryEntry],
+        english_translations: Optional[Tuple[str, ...]] = None
+    ) -> "HeadwordRecord":
+        """
+        Precompute the summaries with the same rules as SearchResult.
+        english_translations, if given, replaces the union of the entries'.
+        """
+        result = SearchResult(word=headword, entries=entries)
+        if english_translations is None:
+            english_translations = tuple(result.get_english_translations())
+        return HeadwordRecord(
+            headword=headword,
+            entries=tuple(entries),
+            english_translations=english_translations,
+            categories=tuple(result.get_grammatical_category()),
+            pos_groups=tuple((pos, tuple(group)) for pos, group in
+                             result.group_by_pos().items()),
+        )
+
+    def group_by_pos(self) -> Dict[str, List[DictionaryEntry]]:
+        return {pos: list(group) for pos, group in self.pos_groups}
+
+    def to_search_result(self, word: Optional[str] = None) -> SearchResult:
+        return SearchResult(word=word or self.headword,
+                            entries=list(self.entries), record=self)
+
+
+@dataclass(frozen=True, slots=True)
+class MergedRecord:
+    """
+    Everything known about one normalized headword across all dictionaries,
+    resolved once at load time. Layers follow dictionary priority
+    (frequency list first, then the full dictionary).
+    """
+    headword: str
+    layers: Tuple[Tuple[DictionaryEntry, ...], ...]
+    english_translations: Tuple[str, ...]  # From the first layer that has any
+
+    @property
+    def entries(self) -> List[DictionaryEntry]:
+        """All entries, highest priority layer first"""
+        return [entry for layer in self.layers for entry in layer]
+
+    def to_search_result(self, word: Optional[str] = None) -> SearchResult:
+        """
+        Every layer's entries, with the translations resolved by priority
+        (as in get_translations()) rather than the union of all layers
+        """
+        entries = self.entries
+        record = HeadwordRecord.from_entries(self.headword, entries,
+                                             self.english_translations)
+        return SearchResult(word=word or self.headword, entries=entries,
+                            record=record)
+
+
 @dataclass
 class TokenizedThaiWord:
     """
@@ -0,0 +1,20 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# Upper bound for one batch lookup, a subtitle screen is far below this
+MAX_LOOKUP_WORDS = 500
+
+
+class LookupRequest(BaseModel):
+    words: List[str] = Field(..., min_length=1, max_length=MAX_LOOKUP_WORDS)
+    # Also transliterate every word with this engine
+    transliteration: Optional[str] = None
+
+    @field_validator('words')
+    def strip_words(cls, v):
+        """Drop surrounding whitespace and empty words"""
+        words = [word.strip() for word in v if word and word.strip()]
+        if not words:
+            raise ValueError('At least one non-empty word is required')
+        return words
@@ -1,26 +1,632 @@
-from utils.dict_util import load_dictionary_from_file, index_by_thai, \
-    search_headwords_only
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, List
+
+from models.dict_schemas import DictionaryEntry, HeadwordRecord, \
+    MergedRecord, SearchResult
+from utils.dict_index import MergedIndex, LayeredIndex
+from utils.dict_sqlite import load_sqlite_index
+from utils.dict_store import MappedDictionary, build_store, get_store_path, \
+    remove_stale_stores, store_lock
+from utils.dict_snapshot import load_index, file_sha1
 from config.settings import settings
 
 
 class DictionaryService:
-    def __init__(self, file: str):
-        self.entries = None
+    def __init__(self, file: str, csv_type: str = "auto", lazy: bool = False):
+        self.file = file
+        self.csv_type = csv_type
+        # Replaced as a whole on reload; lookups read it once per call, so
+        # they see either the old or the new index, never a mix
         self.index = None
-        self.csv_type = "auto"
-        self.load_dictionary(file)
+        self.header: Optional[Dict[str, Any]] = None
+        self.source_hash = None
+        self.version = 0  # Incremented on every index swap
+        self.load_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        # Set after every load attempt, successful or not
+        self._finished = threading.Event()
+        if not lazy:
+            self.load_dictionary(file, csv_type)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded.is_set()
+
+    @property
+    def entries(self) -> Optional[List[DictionaryEntry]]:
+        index = self.index
+        return index.entries if index is not None else None
+
+    def load_dictionary(self, file: Optional[str] = None,
+        csv_type: Optional[str] = None):
+        """
+        Load the dictionary. Does nothing if the same file is already
+        loaded; a different file is loaded and swapped in like a reload.
+        """
+        # Concurrent callers block here until the first load has finished
+        with self._lock:
+            file = file or self.file
+            csv_type = csv_type or self.csv_type
+            if self.index is not None and (file, csv_type) == (
+                self.file, self.csv_type):
+                return
+            print(f"Loading dictionary {file}...")
+            start = time.perf_counter()
+            try:
+                index, header = self._build_index(file, csv_type)
+            except Exception as e:
+                self.load_error = str(e)
+                self._finished.set()
+                print(f"Error loading dictionary {file}: {e}")
+                raise
+            self.file, self.csv_type = file, csv_type
+            self._swap(index, header)
+            self._loaded.set()
+            self._finished.set()
+            print(f"Dictionary loaded! {file} "
+                  f"({len(index.entries)} entries in {time.perf_counter() - start:.2f}s)")
+
+    @staticmethod
+    def _build_index(file: str, csv_type: str):
+        if settings.dict_engine == "sqlite":
+            index, header = load_sqlite_index(file, csv_type)
+        else:
+            index, header = load_index(file, csv_type)
+        # Warm the fuzzy index off the request path if it will be used
+        if settings.dict_fuzzy_fallback:
+            index.build_fuzzy(settings.dict_fuzzy_max_distance)
+        return index, header
+
+    def _swap(self, index, header: Dict[str, Any]):
+        previous = self.index
+        self.header = header
+        self.source_hash = header["source_hash"]
+        self.index = index
+        self.load_error = None
+        self.version += 1
+        # Lookups that started on the previous index may still be running;
+        # the SQLite engine only closes this thread's connection, the rest
+        # go once those lookups are done and the index is dropped
+        if previous is not None and hasattr(previous, "close"):
+            previous.close()
 
-    def load_dictionary(self, file: str, csv_type: str = "auto"):
-        if self.entries is None:
-            print("Loading dictionary...")
-            self.entries = load_dictionary_from_file(file, csv_type)
-            self.index = index_by_thai(self.entries)
-            print("Dictionary loaded!")
+    def source_changed(self) -> bool:
+        """
+        Check whether the CSV on disk differs from the loaded index.
+        Size and mtime are compared first; the file is only hashed when
+        they changed, and a touched but identical file is remembered.
+        """
+        header = self.header
+        if header is None:
+            return False
+        try:
+            stat = os.stat(self.file)
+        except OSError:
+            return False
+        if (stat.st_size == header["source_size"] and
+            stat.st_mtime_ns == header["source_mtime_ns"]):
+            return False
+        if (stat.st_size == header["source_size"] and
+            file_sha1(self.file) == header["source_hash"]):
+            self.header = {**header, "source_mtime_ns": stat.st_mtime_ns}
+            return False
+        return True
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the index from the CSV and swap it in atomically.
+        Lookups keep using the old index while the new one is built.
+        Returns True if a new index was swapped in.
+        """
+        if not self.is_loaded:
+            return False  # Nothing to replace; the first load reads the file
+        with self._lock:
+            if not force and not self.source_changed():
+                return False
+            print(f"Reloading dictionary {self.file}...")
+            start = time.perf_counter()
+            try:
+                index, header = self._build_index(self.file, self.csv_type)
+            except Exception as e:
+                # Keep serving the old index
+                self.load_error = str(e)
+                print(f"Error reloading dictionary {self.file}: {e}")
+                raise
+            self._swap(index, header)
+            print(f"Dictionary reloaded! {self.file} "
+                  f"({len(index.entries)} entries in {time.perf_counter() - start:.2f}s)")
+            return True
+
+    def ensure_loaded(self):
+        """Load on first use if the background loader has not finished yet"""
+        if not self._loaded.is_set():
+            self.load_dictionary()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a load started elsewhere; False on timeout or failure"""
+        self._finished.wait(timeout)
+        return self.is_loaded
 
     def search_word(self, word: str):
-        return search_headwords_only(self.entries, word)
+        self.ensure_loaded()
+        return self.index.search_headword(word)
+
+    def lookup(self, word: str) -> Optional[HeadwordRecord]:
+        self.ensure_loaded()
+        return self.index.lookup(word)
+
+    def get_translations(self, word: str) -> List[str]:
+        """English translations for a headword, precomputed at load time"""
+        record = self.lookup(word)
+        return list(record.english_translations) if record else []
+
+    def search_many(self, words: Iterable[str]) -> Dict[str, SearchResult]:
+        """
+        Look up a batch of words in one pass over the index.
+        Duplicates are resolved once; the result is keyed by input word.
+        """
+        self.ensure_loaded()
+        return self.index.search_many(words)
+
+    def get_translations_many(self, words: Iterable[str]) -> Dict[
+        str, List[str]]:
+        self.ensure_loaded()
+        return {word: list(record.english_translations) if record else []
+                for word, record in self.index.lookup_many(words).items()}
+
+    def search_with_priority(self, term: str):
+        self.ensure_loaded()
+        return self.index.search_with_priority(term)
+
+    def search_by_thai(self, thai_term: str):
+        self.ensure_loaded()
+        return self.index.search_by_thai(thai_term)
+
+    def search_by_english(self, english_term: str):
+        self.ensure_loaded()
+        return self.index.search_by_english(english_term)
+
+    def reverse_lookup(self, english_term: str, limit: Optional[int] = None):
+        self.ensure_loaded()
+        return self.index.reverse_lookup(english_term, limit)
+
+    def search_fuzzy(self, word: str, max_distance: Optional[int] = None,
+        limit: int = 1):
+        """Nearest headwords within a bounded edit distance"""
+        self.ensure_loaded()
+        if max_distance is None:
+            max_distance = settings.dict_fuzzy_max_distance
+        return self.index.search_fuzzy(word, max_distance, limit)
+
+    def get_fuzzy_translations(self, word: str) -> List[str]:
+        """English translations of the nearest headword"""
+        return self.search_fuzzy(word).get_english_translations()
+
+    def autocomplete(self, prefix: str, limit: int = 10, ranked: bool = True):
+        self.ensure_loaded()
+        return self.index.autocomplete(prefix, limit, ranked)
+
+    def search_definitions(self, query: str, limit: int = 20) -> SearchResult:
+        """
+        Full-text search over definitions and samples.
+        Raises ValueError unless the SQLite engine is configured.
+        """
+        self.ensure_loaded()
+        index = self.index
+        if not hasattr(index, "search_definitions"):
+            raise ValueError("Definition search needs the sqlite dictionary "
+                             "engine (DICT_ENGINE=sqlite)")
+        return index.search_definitions(query, limit)
+
+
+class _IndexReaders:
+    """
+    Lookups in progress per index. An index swapped out by a rebuild is
+    closed once the last lookup that started on it is done, not under it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[int, int] = {}
+        self._retired: Dict[int, Any] = {}
+
+    @contextmanager
+    def reading(self, owner):
+        """owner.index, kept open until the block ends"""
+        with self._lock:
+            index = owner.index
+            key = id(index)
+            self._counts[key] = self._counts.get(key, 0) + 1
+        retired = None
+        try:
+            yield index
+        finally:
+            with self._lock:
+                self._counts[key] -= 1
+                if not self._counts[key]:
+                    del self._counts[key]
+                    retired = self._retired.pop(key, None)
+            if retired is not None:
+                retired.close()
+
+    def retire(self, index):
+        """Close index now, or after the lookups still reading it"""
+        with self._lock:
+            if self._counts.get(id(index)):
+                self._retired[id(index)] = index
+                return
+        index.close()
+
+
+class MergedDictionaryService:
+    """
+    Several dictionaries behind one precomputed MergedIndex.
+    Earlier services take priority: a word's translations come from the
+    first dictionary that has any.
+
+    With settings.dict_shared_store the merged index is served from a
+    memory-mapped store file shared by all worker processes; the individual
+    dictionaries are then only loaded if a per-dictionary feature needs them.
+    """
+
+    def __init__(self, *services: DictionaryService):
+        self.services = services
+        self.index: Optional[MergedIndex] = None
+        # Content-derived key of the layers behind self.index, the same in
+        # every worker process; caches of lookup results are keyed on it
+        self.version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._readers = _IndexReaders()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.index is not None
+
+    def ensure_loaded(self):
+        if self.index is not None:
+            return
+        with self._lock:
+            if self.index is None:
+                self._build()
+
+    def rebuild(self):
+        """Rebuild from the current layer indexes and swap it in atomically"""
+        with self._lock:
+            self._build()
+
+    def store_path(self):
+        return get_store_path([(service.file, service.csv_type)
+                               for service in self.services])
+
+    def source_changed(self) -> bool:
+        """True if any dictionary CSV differs from what is being served"""
+        index = self.index
+        if isinstance(index, MappedDictionary):
+            return self.store_path() != index.path
+        return any(service.source_changed() for service in self.services)
+
+    def _merge_layers(self) -> MergedIndex:
+        for service in self.services:
+            service.ensure_loaded()
+        layers = [service.index for service in self.services]
+        if settings.dict_engine == "sqlite":
+            # Merging up front would pull every database into memory
+            return LayeredIndex(layers)
+        return MergedIndex(layers)
+
+    def _layers_version(self) -> str:
+        return hashlib.sha1("".join(
+            service.source_hash for service in self.services).encode()
+        ).hexdigest()[:16]
+
+    def _open_store(self) -> MappedDictionary:
+        """Map the shared store, building it first if no worker has yet"""
+        # One process builds; the others wait for it and map its store
+        with store_lock():
+            path = self.store_path()
+            try:
+                return MappedDictionary(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Warning: Rebuilding unreadable dictionary store {path}: {e}")
+            build_store(self._merge_layers(), path, self._layers_version())
+            remove_stale_stores(path)
+            return MappedDictionary(path)
+
+    def _reading(self):
+        self.ensure_loaded()
+        return self._readers.reading(self)
+
+    def _build(self):
+        previous = self.index
+        start = time.perf_counter()
+        if settings.dict_shared_store:
+            index = self._open_store()
+            version = index.version
+        else:
+            index = self._merge_layers()
+            version = self._layers_version()
+        if settings.dict_fuzzy_fallback:
+            index.build_fuzzy(settings.dict_fuzzy_max_distance)
+        # Index first: a reader that sees the new version must also see the
+        # new index, or it would cache old results under the new version
+        self.index = index
+        self.version = version
+        # A shared store stays mapped (even once its file is pruned) until
+        # closed; lookups already running on it finish first
+        if previous is not None and hasattr(previous, "close"):
+            self._readers.retire(previous)
+        print(f"Merged dictionary index built! ({len(index)} headwords "
+              f"in {time.perf_counter() - start:.2f}s)")
+
+    def lookup(self, word: str) -> Optional[MergedRecord]:
+        with self._reading() as index:
+            return index.lookup(word)
+
+    def search_word(self, word: str):
+        record = self.lookup(word)
+        if record is None:
+            return SearchResult(word=word, entries=[])
+        return record.to_search_result(word)
+
+    def get_translations(self, word: str) -> List[str]:
+        with self._reading() as index:
+            return list(index.get_translations(word))
+
+    def lookup_many(self, words: Iterable[str]) -> Dict[
+        str, Optional[MergedRecord]]:
+        with self._reading() as index:
+            return index.lookup_many(words)
+
+    def search_many(self, words: Iterable[str]) -> Dict[str, SearchResult]:
+        """Batch search_word(), keyed by input word"""
+        return {
+            word: record.to_search_result(word) if record
+            else SearchResult(word=word, entries=[])
+            for word, record in self.lookup_many(words).items()
+        }
+
+    def get_translations_many(self, words: Iterable[str]) -> Dict[
+        str, List[str]]:
+        with self._reading() as index:
+            return {word: list(translations) for word, translations in
+                    index.get_translations_many(words).items()}
+
+    def search_fuzzy(self, word: str, max_distance: Optional[int] = None):
+        """Nearest merged record with translations, as a SearchResult"""
+        if max_distance is None:
+            max_distance = settings.dict_fuzzy_max_distance
+        with self._reading() as index:
+            record = index.lookup_fuzzy(word, max_distance)
+        if record is None:
+            return SearchResult(word=word, entries=[])
+        return record.to_search_result(word)
+
+    def get_fuzzy_translations(self, word: str) -> List[str]:
+        """Translations of the nearest record, resolved like get_translations"""
+        with self._reading() as index:
+            record = index.lookup_fuzzy(word, settings.dict_fuzzy_max_distance)
+        return list(record.english_translations) if record else []
+
+
+# Singleton instances, loaded lazily or by start_background_loading()
+dict_service_freq = DictionaryService(settings.dict_file_freq, lazy=True)
+dict_service_full = DictionaryService(settings.dict_file_full, lazy=True)
+dict_service_telex = DictionaryService(settings.dict_file_telex, lazy=True)
+dict_service_lexitron = DictionaryService(settings.dict_file_lexitron,
+                                          lazy=True)
+
+# Priority order: earlier dictionaries win in merged and cross-dictionary lookups
+dictionary_services: Dict[str, DictionaryService] = {
+    "freq": dict_service_freq,
+    "full": dict_service_full,
+}
+if settings.dict_load_extra:
+    dictionary_services["telex"] = dict_service_telex
+    dictionary_services["lexitron"] = dict_service_lexitron
+
+dict_service_merged = MergedDictionaryService(*dictionary_services.values())
+
+_loader_threads: Dict[str, threading.Thread] = {}
+_loader_threads_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher_thread: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def _load_in_background(service):
+    try:
+        service.ensure_loaded()
+    except Exception as e:
+        # DictionaryService records its own load_error
+        print(f"Background dictionary loading failed: {e}")
+
+
+def _preloaded_services() -> Dict[str, DictionaryService]:
+    """Dictionaries loaded at startup; with the shared store only on demand"""
+    return {} if settings.dict_shared_store else dictionary_services
+
+
+def start_background_loading():
+    """Load all dictionaries in parallel threads. Safe to call repeatedly."""
+    # The merged index waits on the other loaders, then builds itself
+    services = {**_preloaded_services(), "merged": dict_service_merged}
+    with _loader_threads_lock:
+        for name, service in services.items():
+            thread = _loader_threads.get(name)
+            if service.is_loaded or (thread and thread.is_alive()):
+                continue
+            thread = threading.Thread(target=_load_in_background,
+                                      args=(service,),
+                                      name=f"dict-loader-{name}",
+                                      daemon=True)
+            _loader_threads[name] = thread
+            thread.start()
+
+
+def get_dictionary_version() -> Optional[str]:
+    """Version of the merged dictionary data, None until it is loaded"""
+    return dict_service_merged.version
+
+
+def reload_dictionaries(force: bool = False) -> Dict[str, bool]:
+    """
+    Reload every dictionary whose CSV changed (or all with force), then
+    rebuild the merged index. Runs on the caller's thread; lookups keep
+    using the previous indexes until each swap. Returns name -> reloaded.
+    """
+    with _reload_lock:
+        reloaded = {name: service.reload(force)
+                    for name, service in dictionary_services.items()}
+        if (force or any(reloaded.values()) or not dict_service_merged.is_loaded
+            or dict_service_merged.source_changed()):
+            dict_service_merged.rebuild()
+    return reloaded
+
+
+def _watch_dictionary_files(interval: float):
+    while not _watcher_stop.wait(interval):
+        if not dictionaries_ready():
+            continue
+        try:
+            if dict_service_merged.source_changed() or any(
+                service.source_changed()
+                for service in dictionary_services.values()):
+                print("Dictionary file change detected, reloading...")
+                reload_dictionaries()
+        except Exception as e:
+            print(f"Dictionary hot reload failed: {e}")
+
+
+def start_file_watcher():
+    """Poll the dictionary CSVs and hot reload them when they change"""
+    global _watcher_thread
+    interval = settings.dict_watch_interval_seconds
+    if interval <= 0:
+        return
+    with _loader_threads_lock:
+        if _watcher_thread and _watcher_thread.is_alive():
+            return
+        _watcher_stop.clear()
+        _watcher_thread = threading.Thread(target=_watch_dictionary_files,
+                                           args=(interval,),
+                                           name="dict-watcher", daemon=True)
+        _watcher_thread.start()
+
+
+def stop_file_watcher():
+    _watcher_stop.set()
+
+
+def dictionaries_ready() -> bool:
+    return dict_service_merged.is_loaded and all(
+        service.is_loaded for service in _preloaded_services().values())
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until every dictionary is loaded; False on timeout or failure.
+    The loading itself runs on the loader threads, never on the caller's,
+    so the timeout also bounds the merged index (and shared store) build.
+    """
+    start_background_loading()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for service in _preloaded_services().values():
+        if not service.wait_until_loaded(_remaining(deadline)):
+            return False
+    with _loader_threads_lock:
+        merged_loader = _loader_threads.get("merged")
+    if merged_loader is not None:
+        merged_loader.join(_remaining(deadline))
+    return dict_service_merged.is_loaded
+
+
+def reverse_lookup_all(english_term: str, limit: int = 20) -> List[
+    DictionaryEntry]:
+    """
+    English -> Thai lookup across all dictionaries. Frequency-list entries
+    come first; later dictionaries only add headwords not seen yet.
+    """
+    results: List[DictionaryEntry] = []
+    seen_headwords = set()
+    for service in dictionary_services.values():
+        for entry in service.reverse_lookup(english_term):
+            if entry.t_word in seen_headwords:
+                continue
+            seen_headwords.add(entry.t_word)
+            results.append(entry)
+            if len(results) >= limit:
+                return results
+    return results
+
+
+def autocomplete_all(prefix: str, limit: int = 10,
+    ranked: bool = True) -> List[DictionaryEntry]:
+    """
+    Prefix search across all dictionaries, one result per headword.
+    Each dictionary contributes its own top `limit` hits, merged by rank.
+    """
+    hits = []
+    for order, service in enumerate(dictionary_services.values()):
+        for rank, entry in service.autocomplete(prefix, limit, ranked):
+            hits.append((rank if ranked else entry.t_word or "", order, entry))
+    hits.sort(key=lambda hit: hit[:2])
+
+    results: List[DictionaryEntry] = []
+    seen_headwords = set()
+    for _, _, entry in hits:
+        if entry.t_word in seen_headwords:
+            continue
+        seen_headwords.add(entry.t_word)
+        results.append(entry)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def search_definitions_all(query: str, limit: int = 20) -> List[
+    DictionaryEntry]:
+    """
+    Full-text definition search across all dictionaries, in priority order.
+    Raises ValueError unless the SQLite engine is configured.
+    """
+    results: List[DictionaryEntry] = []
+    for service in dictionary_services.values():
+        results.extend(service.search_definitions(
+            query, limit - len(results)).entries)
+        if len(results) >= limit:
+            break
+    return results
 
 
-# Singleton instance
-dict_service_freq = DictionaryService(settings.dict_file_freq)
-dict_service_full = DictionaryService(settings.dict_file_full)
\ No newline at end of file
+def get_readiness() -> Dict[str, Any]:
+    """Load state of every dictionary, for the readiness probe"""
+    return {
+        "ready": dictionaries_ready(),
+        "version": dict_service_merged.version,
+        "dictionaries": {
+            name: {
+                "file": service.file,
+                "loaded": service.is_loaded,
+                "entries": len(service.entries) if service.entries else 0,
+                "source_hash": service.source_hash,
+                "reloads": max(service.version - 1, 0),
+                "error": service.load_error,
+            }
+            for name, service in dictionary_services.items()
+        },
+        "merged_headwords": len(dict_service_merged.index)
+        if dict_service_merged.is_loaded else 0,
+        "shared_store": str(dict_service_merged.index.path)
+        if isinstance(dict_service_merged.index, MappedDictionary) else None,
+    }
@@ -1,16 +1,27 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
+import multiprocessing
+import os
 import re
+import threading
+import time
 from pythainlp.util import normalize
 
+from config.settings import settings
 from models.dict_schemas import TokenizedThaiWord
 from models.subtitle_schemas import AlignedSubtitle, SubtitleEntry, \
     LearningEntry
+from services.dictionary_service import dict_service_merged, \
+    get_dictionary_version
+from utils.learn_cache import collect_inputs, get_cached_result, \
+    store_result
 from utils.local_transcript_util import \
     find_transcript_with_content  # Import your function
-from services.dictionary_service import dict_service_freq, dict_service_full
-from utils.word_util import process_thai_word
+from utils.transliteration_util import warm_up_transliteration
+from utils.word_util import process_thai_words_batch, seed_word_cache, \
+    TOKENIZER_ENGINE
 from pythainlp.tokenize import word_tokenize
 
 
@@ -144,37 +155,94 @@ class SubtitleAlignmentService:
         thai_pattern = r'[\u0E00-\u0E7F]'
         return bool(re.search(thai_pattern, text))
 
+    def warm_up(self):
+        """
+        Load the tokenizer and transliteration data, which otherwise
+        delays the first subtitle of the first request by most of a second
+        """
+        word_tokenize(normalize("สวัสดีครับ"), engine=TOKENIZER_ENGINE,
+                      keep_whitespace=False)
+        warm_up_transliteration()
+
+    def tokenize_thai_sentence(self, thai_text: str) -> List[str]:
+        """Thai word tokens of a sentence, without any dictionary work"""
+        thai_text = normalize(thai_text)
+        tokens = word_tokenize(thai_text, engine=TOKENIZER_ENGINE,
+                               keep_whitespace=False)
+        # Skip empty and non-Thai tokens
+        return [token for token in tokens
+                if token.strip() and self.is_thai_word(token)]
+
     def process_thai_sentence(self, thai_text: str) -> List[
         TokenizedThaiWord]:
         """
         Process a Thai sentence into word breakdown with translations
         """
-        thai_text = normalize(thai_text)
-        tokens = word_tokenize(thai_text, keep_whitespace=False)
-        word_breakdown = []
-
-        for token in tokens:
-            if token.strip() and self.is_thai_word(token):  # Skip empty tokens
+        return process_thai_words_batch(
+            None, self.tokenize_thai_sentence(thai_text))
 
-                processed_word = process_thai_word(token, dict_service_freq, dict_service_full)
-                word_breakdown.append(
-                    processed_word)  # Already a TokenizedThaiWord
-
-        return word_breakdown
-
-    def create_learning_entries(self,
-        aligned_subs: List[AlignedSubtitle]) -> List[LearningEntry]:
+    def iter_word_breakdowns(self, texts: List[str],
+        phase_stats: Optional[Dict[str, float]] = None) -> Iterator[
+        List[TokenizedThaiWord]]:
         """
-        Convert aligned subtitles into learning entries with word analysis
+        Word breakdown of each sentence, in two phases: tokenize every
+        sentence, then resolve each distinct token once (one batch of
+        dictionary lookups and transliterations) and join the results back.
+        Tokens are resolved a chunk of sentences at a time, in order, so
+        the first breakdowns are ready before the last are resolved.
+        Phase timings are added to phase_stats.
         """
-        learning_entries = []
-
-        for aligned_sub in aligned_subs:
-            word_breakdown = self.process_thai_sentence(
-                aligned_sub.thai.text)
-
-
-            learning_entry = LearningEntry(
+        start = time.perf_counter()
+        sentences = [self.tokenize_thai_sentence(text) for text in texts]
+        tokenize_seconds = time.perf_counter() - start
+
+        resolved: Dict[str, TokenizedThaiWord] = {}
+        resolve_seconds = 0.0
+        chunk_size = settings.learn_chunk_size
+        for chunk_start in range(0, len(sentences), chunk_size):
+            chunk = sentences[chunk_start:chunk_start + chunk_size]
+            start = time.perf_counter()
+            new_tokens = [token for token in dict.fromkeys(
+                token for tokens in chunk for token in tokens)
+                          if token not in resolved]
+            if new_tokens:
+                resolved.update(zip(new_tokens, process_thai_words_batch(
+                    None, new_tokens)))
+            resolve_seconds += time.perf_counter() - start
+            for tokens in chunk:
+                yield [resolved[token] for token in tokens]
+
+        if phase_stats is not None:
+            phase_stats["tokenize_seconds"] = phase_stats.get(
+                "tokenize_seconds", 0.0) + tokenize_seconds
+            phase_stats["resolve_seconds"] = phase_stats.get(
+                "resolve_seconds", 0.0) + resolve_seconds
+
+    def iter_learning_entries(self, aligned_subs: List[AlignedSubtitle],
+        token_stats: Optional[Dict[str, Any]] = None) -> Iterator[
+        LearningEntry]:
+        """
+        Yield a learning entry per aligned subtitle as soon as its words
+        are analyzed. Once all are yielded, token_stats is filled with the
+        video's total vs distinct token counts and phase timings.
+        """
+        texts = [aligned_sub.thai.text for aligned_sub in aligned_subs]
+        phase_stats: Dict[str, float] = {}
+        pool = _get_learn_pool() if len(texts) > settings.learn_chunk_size \
+            else None
+        if pool is not None:
+            breakdowns = self._analyze_in_pool(pool, texts, phase_stats)
+        else:
+            breakdowns = self.iter_word_breakdowns(texts, phase_stats)
+
+        total_tokens = 0
+        distinct_tokens = set()
+        # Breakdowns first, so zip() runs that generator to its end and the
+        # phase timings get recorded
+        for word_breakdown, aligned_sub in zip(breakdowns, aligned_subs):
+            total_tokens += len(word_breakdown)
+            distinct_tokens.update(word.thai for word in word_breakdown)
+            yield LearningEntry(
                 thai_text=aligned_sub.thai.text,
                 english_text=aligned_sub.english.text,
                 start_time=aligned_sub.thai.start,
@@ -183,16 +251,72 @@ class SubtitleAlignmentService:
                 word_breakdown=word_breakdown
             )
 
-            learning_entries.append(learning_entry)
+        if token_stats is not None:
+            token_stats.update({
+                "lines": len(texts),
+                "tokens": total_tokens,
+                "unique_tokens": len(distinct_tokens),
+                "unique_ratio": round(len(distinct_tokens) / total_tokens, 3)
+                if total_tokens else 0.0,
+                **{name: round(seconds, 4)
+                   for name, seconds in phase_stats.items()},
+            })
+
+    def _analyze_in_pool(self, pool: ProcessPoolExecutor, texts: List[str],
+        phase_stats: Dict[str, float]) -> Iterator[List[TokenizedThaiWord]]:
+        chunk_size = settings.learn_chunk_size
+        chunks = [texts[start:start + chunk_size]
+                  for start in range(0, len(texts), chunk_size)]
+        done = 0
+        try:
+            # One task per chunk, results come back in cue order; distinct
+            # tokens are resolved once per chunk in each worker
+            for breakdowns, chunk_stats in pool.map(_analyze_cues, chunks):
+                for name, seconds in chunk_stats.items():
+                    phase_stats[name] = phase_stats.get(name, 0.0) + seconds
+                yield from breakdowns
+                done += len(breakdowns)
+        except Exception as e:
+            # E.g. a worker died; finish the remaining lines in this process
+            print(f"Warning: Learn worker pool failed, continuing in "
+                  f"process: {e}")
+            _discard_learn_pool(pool)
+            yield from self.iter_word_breakdowns(texts[done:], phase_stats)
 
-        return learning_entries
+    def create_learning_entries(self,
+        aligned_subs: List[AlignedSubtitle]) -> List[LearningEntry]:
+        """
+        Convert aligned subtitles into learning entries with word analysis
+        """
+        return list(self.iter_learning_entries(aligned_subs))
 
-    def process_video_for_learning(self, video_id: str) -> Dict[str, Any]:
+    @staticmethod
+    def learning_entry_to_dict(entry: LearningEntry) -> Dict[str, Any]:
+        """JSON-ready form of a learning entry"""
+        return {
+            "thai_text": entry.thai_text,
+            "english_text": entry.english_text,
+            "start_time": entry.start_time,
+            "duration": entry.duration,
+            "overlap_score": entry.overlap_score,
+            "word_breakdown": [
+                {
+                    "thai": word.thai,
+                    "transliterated": word.transliterated,
+                    "english_translations": word.english_translations
+                }
+                for word in entry.word_breakdown
+            ]
+        }
+
+    def prepare_video_for_learning(self, video_id: str) -> Tuple[
+        Dict[str, Any], List[AlignedSubtitle]]:
         """
-        Main method: Process a video ID to create learning materials
+        Load and align a video's subtitles without analyzing any words.
 
         Returns:
-            Dict containing learning entries and metadata
+            (summary, aligned subtitles); the summary has "success" False
+            and an "error" message when the video can't be used
         """
         # Get subtitle data
         subtitle_data = self.get_subtitles_for_video(video_id)
@@ -210,9 +334,8 @@ class SubtitleAlignmentService:
 
             return {
                 "success": False,
-                "error": f"Missing subtitles for: {', '.join(missing)}",
-                "learning_entries": []
-            }
+                "error": f"Missing subtitles for: {', '.join(missing)}"
+            }, []
 
         # Extract subtitle entries
         thai_subs = self.extract_subtitle_entries(thai_data)
@@ -221,9 +344,8 @@ class SubtitleAlignmentService:
         if not thai_subs or not eng_subs:
             return {
                 "success": False,
-                "error": "No valid subtitle entries found",
-                "learning_entries": []
-            }
+                "error": "No valid subtitle entries found"
+            }, []
 
         # Align subtitles
         aligned_subs = self.align_subtitles(thai_subs, eng_subs)
@@ -231,12 +353,8 @@ class SubtitleAlignmentService:
         if not aligned_subs:
             return {
                 "success": False,
-                "error": "Could not align any subtitles",
-                "learning_entries": []
-            }
-
-        # Create learning entries
-        learning_entries = self.create_learning_entries(aligned_subs)
+                "error": "Could not align any subtitles"
+            }, []
 
         return {
             "success": True,
@@ -246,25 +364,158 @@ class SubtitleAlignmentService:
             "aligned_count": len(aligned_subs),
             "alignment_rate": len(aligned_subs) / len(
                 thai_subs) if thai_subs else 0,
-            "learning_entries": [
-                {
-                    "thai_text": entry.thai_text,
-                    "english_text": entry.english_text,
-                    "start_time": entry.start_time,
-                    "duration": entry.duration,
-                    "overlap_score": entry.overlap_score,
-                    "word_breakdown": [
-                        {
-                            "thai": word.thai,
-                            "transliterated": word.transliterated,
-                            "english_translations": word.english_translations
-                        }
-                        for word in entry.word_breakdown
-                    ]
-                }
-                for entry in learning_entries
-            ]
+        }, aligned_subs
+
+    def stream_video_for_learning(self, video_id: str) -> Tuple[
+        Dict[str, Any], Iterator[Dict[str, Any]]]:
+        """
+        Like process_video_for_learning, but returns the summary right away
+        with an iterator that analyzes one learning entry at a time. The
+        full result is cached once the iterator is exhausted.
+        """
+        cached = get_cached_result(video_id)
+        if cached is not None:
+            summary = {key: value for key, value in cached.items()
+                       if key != "learning_entries"}
+            return summary, iter(cached["learning_entries"])
+
+        inputs = collect_inputs(video_id)
+        summary, aligned_subs = self.prepare_video_for_learning(video_id)
+
+        def entries():
+            learning_entries = []
+            token_stats = {}
+            for entry in self.iter_learning_entries(aligned_subs, token_stats):
+                learning_entries.append(self.learning_entry_to_dict(entry))
+                yield learning_entries[-1]
+            self._log_token_stats(video_id, token_stats)
+            store_result(video_id, inputs, {**summary,
+                                            "token_stats": token_stats,
+                                            "learning_entries": learning_entries})
+
+        return summary, entries()
+
+    def process_video_for_learning(self, video_id: str) -> Dict[str, Any]:
+        """
+        Main method: Process a video ID to create learning materials
+
+        Returns:
+            Dict containing learning entries and metadata
+        """
+        cached = get_cached_result(video_id)
+        if cached is not None:
+            return cached
+
+        # Inputs first: a transcript replaced while we work makes the cached
+        # result stale instead of wrong
+        inputs = collect_inputs(video_id)
+        summary, aligned_subs = self.prepare_video_for_learning(video_id)
+        if not summary["success"]:
+            return {**summary, "learning_entries": []}
+
+        # Create learning entries
+        token_stats = {}
+        learning_entries = [
+            self.learning_entry_to_dict(entry)
+            for entry in self.iter_learning_entries(aligned_subs, token_stats)
+        ]
+        self._log_token_stats(video_id, token_stats)
+        result = {
+            **summary,
+            "token_stats": token_stats,
+            "learning_entries": learning_entries
         }
+        store_result(video_id, inputs, result)
+        return result
+
+    @staticmethod
+    def _log_token_stats(video_id: str, token_stats: Dict[str, Any]):
+        print(f"Analyzed {video_id}: {token_stats.get('tokens', 0)} tokens, "
+              f"{token_stats.get('unique_tokens', 0)} unique "
+              f"({token_stats.get('unique_ratio', 0.0):.0%}), "
+              f"tokenize {token_stats.get('tokenize_seconds', 0.0):.3f}s, "
+              f"resolve {token_stats.get('resolve_seconds', 0.0):.3f}s")
+
+
+# Worker processes for parallel word analysis (settings.learn_workers)
+_learn_pool: Optional[ProcessPoolExecutor] = None
+_learn_pool_version: Optional[str] = None
+_learn_pool_lock = threading.Lock()
+
+
+def _init_learn_worker():
+    """Worker initializer: load the dictionaries and NLP data once"""
+    dict_service_merged.ensure_loaded()
+    subtitle_alignment_service.warm_up()
+    if settings.word_store_seed:
+        seed_word_cache()
+
+
+def _analyze_cues(texts: List[str]) -> Tuple[
+    List[List[TokenizedThaiWord]], Dict[str, float]]:
+    phase_stats: Dict[str, float] = {}
+    breakdowns = list(
+        subtitle_alignment_service.iter_word_breakdowns(texts, phase_stats))
+    return breakdowns, phase_stats
+
+
+def get_learn_workers() -> int:
+    """Word analysis processes from settings (0 = one per available CPU)"""
+    if settings.learn_workers:
+        return settings.learn_workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _get_learn_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    The worker pool, None in single-process mode. Workers hold their own
+    copy of the dictionaries, so the pool is replaced after a reload.
+    """
+    global _learn_pool, _learn_pool_version
+    workers = get_learn_workers()
+    if workers <= 1:
+        return None
+    version = get_dictionary_version()
+    with _learn_pool_lock:
+        if _learn_pool is not None and _learn_pool_version != version:
+            _learn_pool.shutdown(wait=False)
+            _learn_pool = None
+        if _learn_pool is None:
+            # A forkserver starts workers from a clean process instead of
+            # forking this one with its threads
+            method = "forkserver" if "forkserver" in \
+                multiprocessing.get_all_start_methods() else "spawn"
+            _learn_pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_learn_worker,
+                mp_context=multiprocessing.get_context(method))
+            _learn_pool_version = version
+        return _learn_pool
+
+
+def _discard_learn_pool(pool: ProcessPoolExecutor):
+    global _learn_pool
+    with _learn_pool_lock:
+        if _learn_pool is pool:
+            _learn_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start_learn_workers():
+    """Start the worker pool and load every worker, so no request waits"""
+    pool = _get_learn_pool()
+    if pool is not None:
+        list(pool.map(_analyze_cues, [["สวัสดี"]] * get_learn_workers()))
+
+
+def stop_learn_workers():
+    """Shut the worker pool down (application shutdown)"""
+    global _learn_pool
+    with _learn_pool_lock:
+        if _learn_pool is not None:
+            _learn_pool.shutdown(wait=False, cancel_futures=True)
+            _learn_pool = None
 
 
 # Instance
@@ -0,0 +1,112 @@
+"""
+Bounded in-memory caches that are safe to share between request threads.
+
+FastAPI runs sync handlers in a thread pool, so a module-level dict used as
+a cache is read and written concurrently and, never evicting, grows for as
+long as the server runs. ShardedLRUCache splits its capacity over several
+OrderedDicts, each behind its own lock, so threads working on different
+keys rarely wait on each other. Every shard evicts its least recently used
+entry when full, and entries can optionally expire after a fixed time.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+_MISSING = object()
+
+
+class _Shard:
+    __slots__ = ("entries", "lock", "hits", "misses", "evictions",
+                 "expirations")
+
+    def __init__(self):
+        # Key -> (value, expiry time or None)
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class ShardedLRUCache:
+    """
+    Thread-safe LRU cache with a bounded size and an optional time to live.
+    max_size is the total across shards (each holds max_size / shards);
+    ttl_seconds of 0 keeps entries until they are evicted or cleared.
+    """
+
+    def __init__(self, max_size: int, shards: int = 16,
+        ttl_seconds: float = 0.0):
+        self.shard_count = max(1, min(shards, max_size or 1))
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._shard_size = max(1, -(-max_size // self.shard_count))
+        self._shards = [_Shard() for _ in range(self.shard_count)]
+
+    def _shard(self, key: Hashable) -> _Shard:
+        return self._shards[hash(key) % self.shard_count]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value of key, default if it is missing or expired"""
+        shard = self._shard(key)
+        with shard.lock:
+            item = shard.entries.get(key, _MISSING)
+            if item is _MISSING:
+                shard.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del shard.entries[key]
+                shard.expirations += 1
+                shard.misses += 1
+                return default
+            shard.entries.move_to_end(key)
+            shard.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache value under key, evicting the shard's oldest entry if full"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds \
+            if self.ttl_seconds > 0 else None
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries[key] = (value, expires_at)
+            shard.entries.move_to_end(key)
+            while len(shard.entries) > self._shard_size:
+                shard.entries.popitem(last=False)
+                shard.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, limits and hit/miss/eviction counters summed over shards"""
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        size = 0
+        for shard in self._shards:
+            with shard.lock:
+                size += len(shard.entries)
+                for name in totals:
+                    totals[name] += getattr(shard, name)
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "shards": self.shard_count,
+            "ttl_seconds": self.ttl_seconds,
+            **totals,
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,615 @@
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any, Dict, List, Optional, Set, Iterable, Iterator, \
+    Tuple, Sequence
+
+from models.dict_schemas import DictionaryEntry, SearchResult, MergedRecord, \
+    HeadwordRecord
+from utils.dict_util import normalize_search_term, normalize_query, \
+    normalize_english_key, split_english_terms, split_romanizations, \
+    normalize_prefix_query, \
+    _HEADWORD_FIELDS, _ENGLISH_FIELDS, _THAI_FIELDS, \
+    _SYNONYM_FIELDS, _DEFAULT_FIELDS, _LIST_FIELDS, _REVERSE_ENGLISH_FIELDS, \
+    _ROMAN_PREFIX_FIELDS
+
+# Every field any of the search helpers can look at
+_INDEXED_FIELDS = (_HEADWORD_FIELDS | _ENGLISH_FIELDS | _THAI_FIELDS |
+                   _SYNONYM_FIELDS | _DEFAULT_FIELDS)
+
+# Sorts entries without a frequency rank after the ranked ones
+_UNRANKED = 1 << 30
+
+# Prefix ranges up to this size are ranked by sorting them directly
+_PREFIX_SORT_LIMIT = 2048
+_MAX_CHAR = "\U0010FFFF"
+
+# SymSpell only indexes deletions within this many leading characters
+_FUZZY_PREFIX_LENGTH = 7
+_fuzzy_build_lock = threading.Lock()
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), or max_distance + 1 once it is known to be larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before_previous, previous_row = previous_row, row
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous_row[j] + 1, row[j - 1] + 1,
+                        previous_row[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]):
+                value = min(value, before_previous[j - 2] + 1)
+            row[j] = value
+        if min(row) > max_distance:
+            return max_distance + 1
+    return row[-1]
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by up to max_distance deletions"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def _resolve_many(words: Iterable[str], table: Dict[str, Any]) -> Dict[
+    str, Any]:
+    """
+    Map each distinct word to table[normalized word] (None if missing).
+    Words are deduplicated first and every spelling is normalized once.
+    """
+    return {word: table.get(normalize_query(word)) if word else None
+            for word in dict.fromkeys(words)}
+
+
+def headword_key(entry: DictionaryEntry) -> str:
+    """Normalized headword of an entry, computed once per entry at build"""
+    return normalize_search_term(entry.t_word)
+
+
+def field_keys(entry: DictionaryEntry, t_word_key: Optional[str] = None) -> \
+    Iterator[Tuple[str, str]]:
+    """
+    (field name, normalized key) pairs of an entry's searchable fields.
+    Pass the entry's headword_key() if it is already known.
+    """
+    for field_name in _INDEXED_FIELDS:
+        value = getattr(entry, field_name, None)
+        if not value:
+            continue
+        if field_name == 't_word' and t_word_key is not None:
+            keys = {t_word_key}
+        elif field_name in _LIST_FIELDS:
+            keys = {normalize_search_term(term.strip())
+                    for term in value.split(',')}
+        else:
+            keys = {normalize_search_term(value)}
+        for key in keys:
+            if key:
+                yield field_name, key
+
+
+def english_keys(entry: DictionaryEntry) -> Dict[str, tuple]:
+    """Reverse-lookup keys of an entry with the best rank of each"""
+    freq_rank = entry.freq_rank if entry.freq_rank is not None \
+        else _UNRANKED
+    ranks: Dict[str, tuple] = {}
+    for field_rank, field_name in enumerate(_REVERSE_ENGLISH_FIELDS):
+        terms = split_english_terms(getattr(entry, field_name, None))
+        for item_rank, key in enumerate(terms):
+            rank = (freq_rank, field_rank, item_rank, entry.id)
+            best = ranks.get(key)
+            if best is None or rank < best:
+                ranks[key] = rank
+    return ranks
+
+
+def prefix_keys(entry: DictionaryEntry, t_word_key: Optional[str] = None) \
+    -> Iterator[Tuple[str, tuple]]:
+    """(key, rank) pairs for the headword, romanization and phonetic"""
+    freq_rank = entry.freq_rank if entry.freq_rank is not None \
+        else _UNRANKED
+    keys = [headword_key(entry) if t_word_key is None else t_word_key]
+    for field_name in _ROMAN_PREFIX_FIELDS:
+        keys.extend(split_romanizations(getattr(entry, field_name)))
+    for key in keys:
+        if key:
+            yield key, (freq_rank, len(key), entry.id)
+
+
+def _fuzzy_rank(normalized: str, match: Tuple[int, str],
+    entries: Iterable[DictionaryEntry]) -> tuple:
+    """Sort key for fuzzy hits: distance, frequency rank, shared prefix"""
+    distance, headword = match
+    freq_ranks = [entry.freq_rank for entry in entries
+                  if entry.freq_rank is not None]
+    shared = len(os.path.commonprefix([normalized, headword]))
+    return distance, min(freq_ranks, default=_UNRANKED), -shared, headword
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion index over normalized headwords.
+
+    Every headword's prefix contributes all its variants with up to
+    max_distance characters deleted. At query time the same deletions of the
+    query are looked up, so only a handful of candidates need a real edit
+    distance check. Catches tone-mark and vowel variants, e.g. a missing or
+    extra ่/้, in well under a millisecond.
+    """
+
+    def __init__(self, headwords: Iterable[str], max_distance: int = 1):
+        self.max_distance = max_distance
+        # deletion variant -> headword (str) or list of headwords
+        self.deletes: Dict[str, object] = {}
+        for headword in headwords:
+            for variant in _deletes(headword[:_FUZZY_PREFIX_LENGTH],
+                                    max_distance):
+                bucket = self.deletes.get(variant)
+                if bucket is None:
+                    self.deletes[variant] = headword
+                elif isinstance(bucket, list):
+                    bucket.append(headword)
+                else:
+                    self.deletes[variant] = [bucket, headword]
+
+    def lookup(self, normalized: str, max_distance: Optional[int] = None) -> \
+        List[Tuple[int, str]]:
+        """(distance, headword) pairs within max_distance, nearest first"""
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        if not normalized:
+            return []
+
+        candidates = set()
+        for variant in _deletes(normalized[:_FUZZY_PREFIX_LENGTH],
+                                max_distance):
+            bucket = self.deletes.get(variant)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            else:
+                candidates.add(bucket)
+
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(normalized, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+        matches.sort()
+        return matches
+
+
+class PrefixIndex:
+    """
+    Prefix search over normalized keys, built once and read-only afterwards.
+
+    Keys are kept in one sorted array, a flattened trie: every key sharing a
+    prefix sits in one contiguous range found with two binary searches. For
+    top-k by rank, small ranges are sorted directly; large ranges (short
+    prefixes) walk a precomputed rank order and stop after k hits.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, int, tuple]]):
+        """items: (normalized key, entry position, rank) triples"""
+        rows = sorted(set(items))
+        self.keys: List[str] = [row[0] for row in rows]
+        self.positions: List[int] = [row[1] for row in rows]
+        self.ranks: List[tuple] = [row[2] for row in rows]
+        self.by_rank: List[int] = sorted(range(len(rows)),
+                                         key=self.ranks.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def key_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def iter_matches(self, prefix: str, ranked: bool = True) -> Iterator[
+        Tuple[tuple, int]]:
+        """
+        Lazily yield distinct (rank, entry position) pairs whose key starts
+        with the already-normalized prefix, by rank or in key order.
+        """
+        if not prefix:
+            return
+
+        lo, hi = self.key_range(prefix)
+        if not ranked or hi - lo <= _PREFIX_SORT_LIMIT:
+            rows = range(lo, hi)
+            if ranked:
+                rows = sorted(rows, key=self.ranks.__getitem__)
+        else:
+            rows = (row for row in self.by_rank if lo <= row < hi)
+
+        seen = set()
+        for row in rows:
+            position = self.positions[row]
+            if position not in seen:
+                seen.add(position)
+                yield self.ranks[row], position
+
+    def search(self, prefix: str, limit: int = 10,
+        ranked: bool = True) -> List[Tuple[tuple, int]]:
+        """Up to `limit` results of iter_matches()"""
+        return list(islice(self.iter_matches(prefix, ranked), max(limit, 0)))
+
+
+class DictionaryIndex:
+    """
+    Hash-based lookup engine over a list of DictionaryEntry objects.
+
+    Every key is normalized once when the index is built, so a query only
+    normalizes the search term and probes a dict instead of scanning entries.
+    Each headword maps to a HeadwordRecord whose translations, categories and
+    part-of-speech groups are precomputed, so reading them costs nothing.
+    Besides the headword map, each searchable field has an inverted index
+    from normalized term to entry positions; comma-separated list fields
+    (t_syn, e_related) contribute one key per item.
+
+    The reverse English index maps every case-folded English gloss (split on
+    ';' and ',') to entry positions, ranked by frequency rank, then by how
+    primary the field and the position within its list are.
+    """
+
+    def __init__(self, entries: List[DictionaryEntry]):
+        self.entries = entries
+        # normalized headword -> entries with precomputed summaries
+        self.headwords: Dict[str, HeadwordRecord] = {}
+        # field -> normalized term -> positions in self.entries
+        self.fields: Dict[str, Dict[str, List[int]]] = {}
+        # case-folded English term -> positions, best match first
+        self.english: Dict[str, List[int]] = {}
+        # headword / romanization / phonetic prefixes
+        self.prefixes: Optional[PrefixIndex] = None
+        # Built on demand by build_fuzzy(), never part of a snapshot
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._build()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_fuzzy"] = None
+        return state
+
+    def _build(self):
+        headwords = defaultdict(list)
+        fields = {name: defaultdict(list) for name in _INDEXED_FIELDS}
+        # Headword keys feed three indexes; normalize each one only once
+        t_word_keys = [headword_key(entry) for entry in self.entries]
+
+        for position, entry in enumerate(self.entries):
+            key = t_word_keys[position]
+            for field_name, field_key in field_keys(entry, key):
+                fields[field_name][field_key].append(position)
+            if key:
+                headwords[key].append(entry)
+
+        # Same ordering as search_dictionary(): by ID, file order for ties
+        for bucket in headwords.values():
+            bucket.sort(key=lambda x: x.id)
+        self.headwords = {key: HeadwordRecord.from_entries(key, bucket)
+                          for key, bucket in headwords.items()}
+        self.fields = {name: dict(postings) for name, postings in
+                       fields.items()}
+        self.english = self._build_english()
+        self.prefixes = self._build_prefixes(t_word_keys)
+
+    def _build_english(self) -> Dict[str, List[int]]:
+        ranks: Dict[str, Dict[int, tuple]] = defaultdict(dict)
+        for position, entry in enumerate(self.entries):
+            for key, rank in english_keys(entry).items():
+                ranks[key][position] = rank
+
+        return {key: sorted(by_position, key=by_position.__getitem__)
+                for key, by_position in ranks.items()}
+
+    def _build_prefixes(self, t_word_keys: List[str]) -> PrefixIndex:
+        def items():
+            for position, entry in enumerate(self.entries):
+                for key, rank in prefix_keys(entry, t_word_keys[position]):
+                    yield key, position, rank
+
+        return PrefixIndex(items())
+
+    def __len__(self) -> int:
+        return len(self.headwords)
+
+    def __contains__(self, headword: str) -> bool:
+        return normalize_query(headword) in self.headwords
+
+    def _positions(self, normalized: str, search_fields: Iterable[str]) -> Set[
+        int]:
+        positions: Set[int] = set()
+        for field_name in search_fields:
+            postings = self.fields.get(field_name)
+            if postings is None:
+                raise ValueError(f"Field '{field_name}' is not indexed")
+            positions.update(postings.get(normalized, ()))
+        return positions
+
+    def _sorted_entries(self, positions: Iterable[int]) -> List[
+        DictionaryEntry]:
+        entries = self.entries
+        return [entries[p] for p in
+                sorted(positions, key=lambda p: (entries[p].id, p))]
+
+    def search_headword(self, headword: str) -> SearchResult:
+        """
+        Exact headword lookup, equivalent to search_headwords_only()
+        """
+        if not headword:
+            return SearchResult(word=headword, entries=[])
+
+        record = self.headwords.get(normalize_query(headword))
+        if record is None:
+            return SearchResult(word=headword, entries=[])
+        return record.to_search_result(headword)
+
+    def lookup(self, headword: str) -> Optional[HeadwordRecord]:
+        """The precomputed record for a headword, None if missing"""
+        return self.headwords.get(normalize_query(headword))
+
+    def lookup_many(self, headwords: Iterable[str]) -> Dict[
+        str, Optional[HeadwordRecord]]:
+        """Records for a batch of headwords in one pass, keyed by input word"""
+        return _resolve_many(headwords, self.headwords)
+
+    def search_many(self, headwords: Iterable[str]) -> Dict[str, SearchResult]:
+        """Batch search_headword(), keyed by input word"""
+        return {
+            word: record.to_search_result(word) if record
+            else SearchResult(word=word, entries=[])
+            for word, record in self.lookup_many(headwords).items()
+        }
+
+    def search(self, search_term: str,
+        search_fields: Optional[Set[str]] = None) -> SearchResult:
+        """
+        Exact match over the given fields, equivalent to search_dictionary()
+        """
+        if not search_term or not self.entries:
+            return SearchResult(word=search_term, entries=[])
+
+        if search_fields is None:
+            search_fields = _DEFAULT_FIELDS
+
+        positions = self._positions(normalize_query(search_term),
+                                    search_fields)
+        return SearchResult(word=search_term,
+                            entries=self._sorted_entries(positions))
+
+    def search_by_english(self, english_term: str) -> SearchResult:
+        return self.search(english_term, _ENGLISH_FIELDS)
+
+    def search_by_thai(self, thai_term: str) -> SearchResult:
+        return self.search(thai_term, _THAI_FIELDS)
+
+    def search_with_priority(self, search_term: str) -> SearchResult:
+        """
+        Headword matches first, then synonym/related-term matches,
+        equivalent to search_with_priority()
+        """
+        if not search_term or not self.entries:
+            return SearchResult(word=search_term, entries=[])
+
+        normalized = normalize_query(search_term)
+        headword_positions = self._positions(normalized, _HEADWORD_FIELDS)
+        synonym_positions = self._positions(normalized, _SYNONYM_FIELDS)
+        synonym_positions -= headword_positions
+
+        return SearchResult(
+            word=search_term,
+            entries=(self._sorted_entries(headword_positions) +
+                     self._sorted_entries(synonym_positions)))
+
+    def reverse_lookup(self, english_term: str,
+        limit: Optional[int] = None) -> SearchResult:
+        """
+        English -> Thai lookup: entries whose English glosses contain the
+        term as one list item, best ranked first
+        """
+        positions = self.english.get(normalize_english_key(english_term), [])
+        if limit is not None:
+            positions = positions[:limit]
+        return SearchResult(word=english_term,
+                            entries=[self.entries[p] for p in positions])
+
+    def autocomplete(self, prefix: str, limit: int = 10,
+        ranked: bool = True) -> List[Tuple[tuple, DictionaryEntry]]:
+        """
+        Entries whose headword, romanization or phonetic spelling starts with
+        the prefix, as (rank, entry) pairs with one entry per headword.
+        Ranked by freq_rank, then by shorter key; ranked=False returns them
+        in key order instead.
+        """
+        results = []
+        seen_headwords = set()
+        for rank, position in self.prefixes.iter_matches(
+            normalize_prefix_query(prefix), ranked):
+            if len(results) >= limit:
+                break
+            entry = self.entries[position]
+            if entry.t_word in seen_headwords:
+                continue
+            seen_headwords.add(entry.t_word)
+            results.append((rank, entry))
+        return results
+
+    def build_fuzzy(self, max_distance: int = 1) -> FuzzyIndex:
+        """Build the fuzzy index once; concurrent callers share it"""
+        if self._fuzzy is None or self._fuzzy.max_distance < max_distance:
+            with _fuzzy_build_lock:
+                if (self._fuzzy is None or
+                    self._fuzzy.max_distance < max_distance):
+                    self._fuzzy = FuzzyIndex(self.headwords, max_distance)
+        return self._fuzzy
+
+    def search_fuzzy(self, word: str, max_distance: int = 1,
+        limit: int = 1) -> SearchResult:
+        """
+        Typo-tolerant headword lookup: entries of the `limit` nearest
+        headwords within max_distance edits, nearest (then most frequent)
+        first, preferring a longer shared prefix on ties. An exact match is
+        returned on its own.
+        """
+        normalized = normalize_query(word)
+        if not normalized:
+            return SearchResult(word=word, entries=[])
+
+        exact = self.headwords.get(normalized)
+        if exact:
+            return exact.to_search_result(word)
+
+        matches = self.build_fuzzy(max_distance).lookup(normalized,
+                                                        max_distance)
+
+        def rank(match):
+            return _fuzzy_rank(normalized, match,
+                               self.headwords[match[1]].entries)
+
+        entries = []
+        for _, headword in sorted(matches, key=rank)[:limit]:
+            entries.extend(self.headwords[headword].entries)
+        return SearchResult(word=word, entries=entries)
+
+
+def _headword_union(layers: Sequence[DictionaryIndex]) -> Dict[str, None]:
+    keys = {}  # Ordered union of headword keys
+    for layer in layers:
+        keys.update(dict.fromkeys(layer.headwords))
+    return keys
+
+
+def _merge_layers(key: str, layer_records: Sequence[Optional[HeadwordRecord]]
+    ) -> MergedRecord:
+    entry_layers = tuple(record.entries if record else ()
+                         for record in layer_records)
+    translations = ()
+    for record in layer_records:
+        if record and record.english_translations:
+            translations = record.english_translations
+            break
+    return MergedRecord(headword=key, layers=entry_layers,
+                        english_translations=translations)
+
+
+class MergedIndex:
+    """
+    One lookup structure over several DictionaryIndex layers.
+
+    Each normalized headword resolves to a single MergedRecord holding the
+    entries of every layer plus the English translations that the layered
+    lookup would return (first layer with any translations wins), so a word
+    lookup is one dict probe instead of one search per dictionary.
+    """
+
+    def __init__(self, layers: Sequence[DictionaryIndex]):
+        self.records: Dict[str, MergedRecord] = {}
+        self._fuzzy: Optional[FuzzyIndex] = None
+
+        for key in _headword_union(layers):
+            self.records[key] = _merge_layers(
+                key, [layer.headwords.get(key) for layer in layers])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, word: str) -> Optional[MergedRecord]:
+        """The merged record for a word, None if no layer has it"""
+        return self.records.get(normalize_query(word))
+
+    def lookup_many(self, words: Iterable[str]) -> Dict[
+        str, Optional[MergedRecord]]:
+        """Merged records for a batch of words in one pass, keyed by input word"""
+        return _resolve_many(words, self.records)
+
+    def get_translations(self, word: str) -> Tuple[str, ...]:
+        record = self.lookup(word)
+        return record.english_translations if record else ()
+
+    def get_translations_many(self, words: Iterable[str]) -> Dict[
+        str, Tuple[str, ...]]:
+        return {word: record.english_translations if record else ()
+                for word, record in self.lookup_many(words).items()}
+
+    def build_fuzzy(self, max_distance: int = 1) -> FuzzyIndex:
+        if self._fuzzy is None or self._fuzzy.max_distance < max_distance:
+            with _fuzzy_build_lock:
+                if (self._fuzzy is None or
+                    self._fuzzy.max_distance < max_distance):
+                    self._fuzzy = FuzzyIndex(self.records, max_distance)
+        return self._fuzzy
+
+    def lookup_fuzzy(self, word: str, max_distance: int = 1) -> Optional[
+        MergedRecord]:
+        """
+        Nearest record within max_distance edits that has translations,
+        preferring frequency-ranked words, then a longer shared prefix
+        """
+        normalized = normalize_query(word)
+        if not normalized:
+            return None
+
+        def rank(match):
+            return _fuzzy_rank(normalized, match, self.records[match[1]].entries)
+
+        matches = self.build_fuzzy(max_distance).lookup(normalized,
+                                                        max_distance)
+        for _, key in sorted(matches, key=rank):
+            if self.records[key].english_translations:
+                return self.records[key]
+        return None
+
+
+class LayeredRecords(Mapping):
+    """
+    Merged records resolved on access from each layer's headword map,
+    for layers that are not held in memory (the SQLite engine)
+    """
+
+    def __init__(self, layers: Sequence[DictionaryIndex]):
+        self.layers = layers
+        self._length: Optional[int] = None
+
+    def __getitem__(self, key: str) -> MergedRecord:
+        layer_records = [layer.headwords.get(key) for layer in self.layers]
+        if not any(layer_records):
+            raise KeyError(key)
+        return _merge_layers(key, layer_records)
+
+    def __contains__(self, key) -> bool:
+        return any(key in layer.headwords for layer in self.layers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_headword_union(self.layers))
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = len(_headword_union(self.layers))
+        return self._length
+
+
+class LayeredIndex(MergedIndex):
+    """MergedIndex that merges the layers per lookup instead of up front"""
+
+    def __init__(self, layers: Sequence[DictionaryIndex]):
+        self.records = LayeredRecords(layers)
+        self._fuzzy = None
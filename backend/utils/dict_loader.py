@@ -0,0 +1,207 @@
+"""
+Parallel parsing of large dictionary CSV files.
+
+Parsing is pure Python (csv module, a DictionaryEntry per row, NFC on
+every field), so one thread uses one core no matter how many the host has.
+The loader splits a CSV into byte ranges that end on record boundaries and
+parses the ranges in a pool of worker processes. Workers send back plain
+tuples of field values, which are much cheaper to pickle than
+DictionaryEntry objects; the entries are rebuilt in file order so the
+result is identical to load_dictionary_from_file.
+
+Record boundaries are found without parsing: a newline ends a record when
+the number of double quotes since the previous boundary is even ("" escapes
+count twice, so quoted newlines are never split).
+
+Compare with the serial parser from the backend directory:
+    python -m utils.dict_loader [csv_path ...]
+"""
+import codecs
+import csv
+import dataclasses
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from models.dict_schemas import DictionaryEntry
+from utils.dict_util import detect_csv_type, iter_csv_rows, \
+    load_dictionary_from_file
+
+# Smaller ranges are not worth a round trip to a worker process
+_MIN_CHUNK_BYTES = 2 * 1024 * 1024
+
+_FIELD_NAMES = [f.name for f in dataclasses.fields(DictionaryEntry)]
+
+# One pool shared by concurrent loads (the dictionaries load in parallel
+# threads at startup), shut down when the last load using it finishes
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_users = 0
+_pool_lock = threading.Lock()
+
+
+def get_load_workers() -> int:
+    """Worker processes to use, from settings (0 = one per available CPU)"""
+    if settings.dict_load_workers:
+        return settings.dict_load_workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def split_csv(data: bytes, chunk_count: int) -> Tuple[
+    List[str], List[Tuple[int, int]]]:
+    """
+    Split raw CSV bytes into the parsed header and at most chunk_count
+    (start, end) byte ranges of whole records following it
+    """
+    start = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    header_end = _record_end(data, start, start)
+    header_rows = list(csv.reader(io.StringIO(
+        data[start:header_end].decode("utf-8"), newline="")))
+    header = [name.strip() for name in header_rows[0]] if header_rows else []
+
+    ranges = []
+    chunk_size = max((len(data) - header_end) // max(chunk_count, 1), 1)
+    position = header_end
+    while position < len(data):
+        end = _record_end(data, position, position + chunk_size)
+        ranges.append((position, end))
+        position = end
+    return header, ranges
+
+
+def _record_end(data: bytes, boundary: int, target: int) -> int:
+    """First record boundary at or after target; boundary is a known one"""
+    quotes = data.count(b'"', boundary, target)
+    position = target
+    while True:
+        newline = data.find(b"\n", position)
+        if newline < 0:
+            return len(data)
+        quotes += data.count(b'"', position, newline)
+        if quotes % 2 == 0:
+            return newline + 1
+        position = newline + 1
+
+
+def _parse_range(path: str, start: int, end: int, header: List[str],
+    csv_type: str) -> List[tuple]:
+    """Worker: parse one byte range into DictionaryEntry field tuples"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return [tuple(getattr(entry, name) for name in _FIELD_NAMES)
+            for entry in iter_csv_rows(io.StringIO(text, newline=""),
+                                       header, csv_type)]
+
+
+def _acquire_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_users
+    with _pool_lock:
+        if _pool is None:
+            # Never fork the loading threads' process: a forkserver starts
+            # workers from a clean single-threaded process
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                # Import the parsers once in the server, not in every worker
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=context)
+        _pool_users += 1
+        return _pool
+
+
+def _release_pool(failed: bool = False):
+    global _pool, _pool_users
+    with _pool_lock:
+        _pool_users -= 1
+        # A failed pool is replaced even while other loads still hold it
+        if (_pool_users == 0 or failed) and _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def load_dictionary_parallel(path: str, csv_type: str = "auto",
+    workers: Optional[int] = None) -> Tuple[
+    List[DictionaryEntry], Dict[str, float]]:
+    """
+    Load a CSV like load_dictionary_from_file, parsing byte ranges in
+    worker processes. Returns the entries and per-stage timings in seconds
+    ("split", "parse", "merge"); small files are parsed serially.
+    """
+    workers = workers or get_load_workers()
+    if workers <= 1 or os.path.getsize(path) < 2 * _MIN_CHUNK_BYTES:
+        start = time.perf_counter()
+        entries = load_dictionary_from_file(path, csv_type)
+        return entries, {"parse": time.perf_counter() - start}
+
+    timings = {}
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    chunk_count = min(workers, len(data) // _MIN_CHUNK_BYTES)
+    header, ranges = split_csv(data, chunk_count)
+    del data
+    if csv_type == "auto":
+        csv_type = detect_csv_type(header)
+    timings["split"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pool = _acquire_pool(workers)
+    try:
+        futures = [pool.submit(_parse_range, path, range_start, range_end,
+                               header, csv_type)
+                   for range_start, range_end in ranges]
+        chunks = [future.result() for future in futures]
+    except Exception as e:
+        # E.g. workers that cannot start because the main script has no
+        # __main__ guard; the serial parser also reports real parse errors
+        _release_pool(failed=True)
+        print(f"Warning: Parallel parsing of {path} failed, "
+              f"parsing serially: {e}")
+        return load_dictionary_parallel(path, csv_type, workers=1)
+    _release_pool()
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Pickle keeps the parsers' interned values shared within each chunk,
+    # so re-interning them here would cost more than the few copies it saves
+    entries = [DictionaryEntry(*values) for chunk in chunks for values in chunk]
+    timings["merge"] = time.perf_counter() - start
+    timings["chunks"] = len(ranges)
+    return entries, timings
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """One-line summary of load stage timings, e.g. for startup logs"""
+    parts = []
+    for stage, value in timings.items():
+        if stage == "chunks":
+            parts.append(f"{int(value)} chunks")
+        else:
+            parts.append(f"{stage} {value:.2f}s")
+    return ", ".join(parts)
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [settings.dict_file_freq, settings.dict_file_full,
+                             settings.dict_file_telex,
+                             settings.dict_file_lexitron]
+    for path in paths:
+        serial_entries, serial_timings = load_dictionary_parallel(path,
+                                                                  workers=1)
+        parallel_entries, parallel_timings = load_dictionary_parallel(path)
+        same = serial_entries == parallel_entries
+        print(f"{path}: {len(parallel_entries)} entries "
+              f"({'identical' if same else 'MISMATCH'})")
+        print(f"  serial  : {format_timings(serial_timings)}")
+        print(f"  parallel: {format_timings(parallel_timings)} "
+              f"({get_load_workers()} workers)")
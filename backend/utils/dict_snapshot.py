@@ -0,0 +1,208 @@
+"""
+Precompiled binary snapshots of the dictionary CSV files.
+
+Parsing a CSV means reading every row, building a DictionaryEntry per
+row and NFC-normalizing every field, then normalizing every key again to
+build the DictionaryIndex. A snapshot stores the finished index (which owns
+the entries) as a pickle next to a small header describing the source file,
+so later processes can skip all of that work.
+
+Snapshot layout (two consecutive pickles in one file):
+    1. header dict: version, csv_type, source size/mtime/sha1, entry count
+    2. DictionaryIndex, including its list of DictionaryEntry objects
+
+Build all snapshots ahead of time with:
+    python -m utils.dict_snapshot
+"""
+import gc
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+from config.settings import settings
+from utils.dict_index import DictionaryIndex
+from utils.dict_loader import format_timings, load_dictionary_parallel
+
+# Bump whenever DictionaryEntry, DictionaryIndex or the parsing rules change
+SNAPSHOT_VERSION = 6
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Parses of a CSV that keeps changing while it is read, before giving up on
+# saving the result
+BUILD_ATTEMPTS = 3
+
+
+def get_snapshot_dir() -> Path:
+    """Get the directory where dictionary snapshots are stored"""
+    return Path(settings.dict_snapshot_dir)
+
+
+def get_snapshot_path(csv_path: str, csv_type: str = "auto") -> Path:
+    """Get the snapshot file path for a dictionary CSV"""
+    return get_snapshot_dir() / f"{Path(csv_path).stem}.{csv_type}.snapshot"
+
+
+def file_sha1(path: str) -> str:
+    """SHA-1 of a file's content, read in chunks"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_header(csv_path: str, csv_type: str,
+    source_hash: Optional[str] = None,
+    version: int = SNAPSHOT_VERSION) -> Dict[str, Any]:
+    stat = os.stat(csv_path)
+    return {
+        "version": version,
+        "csv_type": csv_type,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_hash": source_hash or file_sha1(csv_path),
+    }
+
+
+def source_changed(csv_path: str, header: Dict[str, Any]) -> bool:
+    """Whether the CSV no longer has the size and mtime recorded in header"""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return True
+    return stat.st_size != header["source_size"] or \
+        stat.st_mtime_ns != header["source_mtime_ns"]
+
+
+def read_snapshot_header(snapshot_path: Path) -> Optional[Dict[str, Any]]:
+    """Read only the header of a snapshot, None if missing or unreadable"""
+    try:
+        with open(snapshot_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def is_snapshot_fresh(csv_path: str, csv_type: str = "auto",
+    header: Optional[Dict[str, Any]] = None,
+    version: int = SNAPSHOT_VERSION) -> bool:
+    """
+    Check whether the snapshot matches the current CSV file.
+    Size and mtime are compared first; the content hash is only computed
+    when the mtime changed, so a touched but unmodified file stays valid.
+    """
+    if header is None:
+        header = read_snapshot_header(get_snapshot_path(csv_path, csv_type))
+    if not header or header.get("version") != version:
+        return False
+    if header.get("csv_type") != csv_type:
+        return False
+
+    stat = os.stat(csv_path)
+    if header.get("source_size") != stat.st_size:
+        return False
+    if header.get("source_mtime_ns") == stat.st_mtime_ns:
+        return True
+    return header.get("source_hash") == file_sha1(csv_path)
+
+
+def _build_index(csv_path: str, csv_type: str) -> Tuple[
+    DictionaryIndex, Dict[str, Any], bool]:
+    """
+    Parse and index the CSV. The header describes the file as it was before
+    parsing; the flag is False if the file still changed during the last try.
+    """
+    for attempt in range(1, BUILD_ATTEMPTS + 1):
+        header = _source_header(csv_path, csv_type)
+        entries, timings = load_dictionary_parallel(csv_path, csv_type)
+        start = time.perf_counter()
+        index = DictionaryIndex(entries)
+        timings["index"] = time.perf_counter() - start
+        print(f"Dictionary parsed: {csv_path} ({format_timings(timings)})")
+        header["entry_count"] = len(index.entries)
+        if not source_changed(csv_path, header):
+            return index, header, True
+        print(f"Warning: {csv_path} changed while it was parsed "
+              f"(attempt {attempt} of {BUILD_ATTEMPTS})")
+    return index, header, False
+
+
+def build_snapshot(csv_path: str, csv_type: str = "auto") -> Tuple[
+    DictionaryIndex, Dict[str, Any]]:
+    """Parse the CSV, index it and write the snapshot. Returns index and header."""
+    index, header, stable = _build_index(csv_path, csv_type)
+    if not stable:
+        # A snapshot would claim to match a file it was not parsed from
+        print(f"Warning: Not saving a snapshot of {csv_path}, it kept changing")
+        return index, header
+
+    snapshot_path = get_snapshot_path(csv_path, csv_type)
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so readers never see a partial snapshot
+        tmp_path = snapshot_path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+        print(f"Dictionary snapshot saved: {snapshot_path}")
+    except Exception as e:
+        print(f"Warning: Failed to save dictionary snapshot: {e}")
+
+    return index, header
+
+
+def load_snapshot(csv_path: str, csv_type: str = "auto") -> Optional[
+    Tuple[DictionaryIndex, Dict[str, Any]]]:
+    """Load the index from a fresh snapshot, None if missing or stale"""
+    snapshot_path = get_snapshot_path(csv_path, csv_type)
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+            if not is_snapshot_fresh(csv_path, csv_type, header):
+                return None
+            # Unpickling creates tens of thousands of objects at once;
+            # the cyclic GC only slows that down
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                index = pickle.load(f)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        return index, header
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Failed to load dictionary snapshot {snapshot_path}: {e}")
+        return None
+
+
+def load_index(csv_path: str, csv_type: str = "auto") -> Tuple[
+    DictionaryIndex, Dict[str, Any]]:
+    """
+    Load the indexed dictionary, preferring a fresh snapshot.
+    Rebuilds the snapshot automatically when it is missing or stale.
+    """
+    if not settings.dict_snapshot_enabled:
+        index, header, _ = _build_index(csv_path, csv_type)
+        return index, header
+
+    snapshot = load_snapshot(csv_path, csv_type)
+    if snapshot is not None:
+        return snapshot
+
+    print(f"Dictionary snapshot missing or stale, rebuilding: {csv_path}")
+    return build_snapshot(csv_path, csv_type)
+
+
+if __name__ == "__main__":
+    for path in (settings.dict_file_freq, settings.dict_file_full,
+                 settings.dict_file_telex, settings.dict_file_lexitron):
+        start = time.perf_counter()
+        built_index, _ = build_snapshot(path)
+        print(f"{path}: {len(built_index.entries)} entries "
+              f"in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,454 @@
+"""
+On-disk SQLite storage engine for a dictionary CSV.
+
+Instead of holding entries and indexes in memory, everything lives in one
+SQLite database per CSV, next to the pickle snapshots:
+
+    meta          source header (version, csv_type, size/mtime/sha1, count)
+    entries       one row per DictionaryEntry, rowid = position in the CSV,
+                  plus t_word_key (normalized headword, B-tree indexed)
+    field_keys    (field, key, position): normalized field values and
+                  synonym/related list items, B-tree indexed on key
+    english_keys  reverse-lookup keys with their rank columns
+    prefix_keys   headword/romanization keys for autocomplete
+    definitions   FTS5 (trigram tokenizer, works for unspaced Thai) over
+                  t_def and the sample sentences
+
+SqliteDictionaryIndex plugs these tables into DictionaryIndex through
+read-only mapping adapters, so every search method (and its ordering) is
+the in-memory one; only search_definitions() is specific to this engine.
+
+Build all databases ahead of time with:
+    python -m utils.dict_sqlite
+"""
+import dataclasses
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Iterable
+
+from config.settings import settings
+from models.dict_schemas import DictionaryEntry, HeadwordRecord, \
+    SearchResult, _INTERNED_FIELDS, _NUMERIC_FIELDS
+from utils.dict_index import DictionaryIndex, PrefixIndex, field_keys, \
+    headword_key, english_keys, prefix_keys, _INDEXED_FIELDS, _MAX_CHAR
+from utils.dict_snapshot import BUILD_ATTEMPTS, _source_header, \
+    is_snapshot_fresh, source_changed
+from utils.dict_util import iter_dictionary_file, normalize_query
+
+# Bump whenever the schema or the key extraction rules change
+SQLITE_SCHEMA_VERSION = 1
+
+# trigram needs at least three characters; shorter queries use LIKE
+_FTS_MIN_QUERY = 3
+_BATCH_SIZE = 5000
+
+_FIELD_NAMES = [f.name for f in dataclasses.fields(DictionaryEntry)]
+_FIELD_TYPES = {name: {int: "INTEGER", float: "REAL"}.get(
+    _NUMERIC_FIELDS.get(name), "TEXT") for name in _FIELD_NAMES}
+_ENTRY_COLUMNS = ", ".join(_FIELD_NAMES)
+_DEFINITION_COLUMNS = ("t_def", "t_sample_sentence", "sample_sentence",
+                       "freq_example")
+
+_SCHEMA = f"""
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE entries (
+    position INTEGER PRIMARY KEY,
+    {", ".join(f"{name} {_FIELD_TYPES[name]}" for name in _FIELD_NAMES)},
+    t_word_key TEXT
+);
+CREATE TABLE field_keys (key TEXT, field TEXT, position INTEGER);
+CREATE TABLE english_keys (key TEXT, freq_rank INTEGER, field_rank INTEGER,
+    item_rank INTEGER, entry_id INTEGER, position INTEGER);
+CREATE TABLE prefix_keys (key TEXT, freq_rank INTEGER, key_len INTEGER,
+    entry_id INTEGER, position INTEGER);
+CREATE VIRTUAL TABLE definitions USING fts5(
+    {", ".join(_DEFINITION_COLUMNS)},
+    content='entries', content_rowid='position', tokenize='trigram'
+);
+"""
+
+# Created after the bulk insert, which is much faster than keeping them live
+_INDEXES = """
+CREATE INDEX entries_t_word_key ON entries (t_word_key, id, position);
+CREATE INDEX field_keys_key ON field_keys (key, field, position);
+CREATE INDEX english_keys_key ON english_keys (key, freq_rank, field_rank,
+    item_rank, entry_id, position);
+CREATE INDEX prefix_keys_key ON prefix_keys (key, position);
+INSERT INTO definitions (definitions) VALUES ('rebuild');
+"""
+
+
+def get_sqlite_path(csv_path: str, csv_type: str = "auto") -> Path:
+    """Get the SQLite database path for a dictionary CSV"""
+    return Path(settings.dict_snapshot_dir) / \
+        f"{Path(csv_path).stem}.{csv_type}.sqlite"
+
+
+def _read_header(db_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE name = 'header'").fetchone()
+        return json.loads(row[0]) if row else None
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def build_database(csv_path: str, csv_type: str = "auto") -> Dict[str, Any]:
+    """
+    Stream the CSV into a new database (atomically). Returns its header.
+    If the CSV changes while it is read, it is read again; a database built
+    from a file that kept changing is used but recorded as stale.
+    """
+    db_path = get_sqlite_path(csv_path, csv_type)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(f".tmp{os.getpid()}")
+    for attempt in range(1, BUILD_ATTEMPTS + 1):
+        # Describe the file as it is before reading it
+        header = _source_header(csv_path, csv_type,
+                                version=SQLITE_SCHEMA_VERSION)
+        _write_database(csv_path, csv_type, tmp_path, header)
+        if not source_changed(csv_path, header):
+            break
+        print(f"Warning: {csv_path} changed while it was read "
+              f"(attempt {attempt} of {BUILD_ATTEMPTS})")
+    else:
+        # Never matches a file, so the next load rebuilds it
+        header["source_hash"] = None
+        header["source_mtime_ns"] = None
+        _write_header(tmp_path, header)
+    os.replace(tmp_path, db_path)
+    print(f"Dictionary database saved: {db_path}")
+    return header
+
+
+def _write_header(db_path: Path, header: Dict[str, Any]):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('header', ?)",
+                         (json.dumps(header),))
+    finally:
+        conn.close()
+
+
+def _write_database(csv_path: str, csv_type: str, tmp_path: Path,
+    header: Dict[str, Any]):
+    """Stream the CSV into a fresh database at tmp_path, header included"""
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    count = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        conn.executescript(_SCHEMA)
+        entry_sql = (f"INSERT INTO entries (position, {_ENTRY_COLUMNS}, "
+                     f"t_word_key) VALUES "
+                     f"({', '.join('?' * (len(_FIELD_NAMES) + 2))})")
+        rows, fields, english, prefixes = [], [], [], []
+
+        def flush():
+            conn.executemany(entry_sql, rows)
+            conn.executemany("INSERT INTO field_keys VALUES (?, ?, ?)", fields)
+            conn.executemany("INSERT INTO english_keys VALUES (?, ?, ?, ?, ?, ?)",
+                             english)
+            conn.executemany("INSERT INTO prefix_keys VALUES (?, ?, ?, ?, ?)",
+                             prefixes)
+            for batch in (rows, fields, english, prefixes):
+                batch.clear()
+
+        for position, entry in enumerate(iter_dictionary_file(csv_path, csv_type)):
+            t_word_key = headword_key(entry)
+            rows.append((position,
+                         *(getattr(entry, name) for name in _FIELD_NAMES),
+                         t_word_key or None))
+            fields.extend((key, field_name, position)
+                          for field_name, key in field_keys(entry, t_word_key))
+            english.extend((key, *rank, position)
+                           for key, rank in english_keys(entry).items())
+            prefixes.extend((key, *rank, position)
+                            for key, rank in prefix_keys(entry, t_word_key))
+            count = position + 1
+            if len(rows) >= _BATCH_SIZE:
+                flush()
+        flush()
+        conn.executescript(_INDEXES)
+
+        header["entry_count"] = count
+        header["headword_count"] = conn.execute(
+            "SELECT COUNT(DISTINCT t_word_key) FROM entries").fetchone()[0]
+        conn.execute("INSERT INTO meta VALUES ('header', ?)",
+                     (json.dumps(header),))
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+class _Connections:
+    """
+    One read-only connection per thread (sqlite3 objects are per-thread).
+    They live only in thread-local storage, so a thread's connection is
+    closed when the thread exits or when this object is dropped.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                   check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """
+        Close the calling thread's connection. Other threads may be in the
+        middle of a query on theirs; those are closed once the index that
+        owns this object is no longer used and is dropped.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+
+def _entry_from_row(row: Sequence) -> DictionaryEntry:
+    values = list(row)
+    for i, name in enumerate(_FIELD_NAMES):
+        if name in _INTERNED_FIELDS and values[i] is not None:
+            values[i] = sys.intern(values[i])
+    return DictionaryEntry(*values)
+
+
+class SqliteEntries(Sequence):
+    """Entries by position, read from the database on access"""
+
+    def __init__(self, conn: _Connections, count: int):
+        self._conn = conn
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> DictionaryEntry:
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        row = self._conn().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE position = ?",
+            (position,)).fetchone()
+        if row is None:
+            raise IndexError(position)
+        return _entry_from_row(row)
+
+    def __iter__(self) -> Iterator[DictionaryEntry]:
+        for row in self._conn().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM entries ORDER BY position"):
+            yield _entry_from_row(row)
+
+    def get_many(self, positions: Iterable[int]) -> Dict[int, DictionaryEntry]:
+        positions = list(positions)
+        found = {}
+        for start in range(0, len(positions), 500):
+            chunk = positions[start:start + 500]
+            for row in self._conn().execute(
+                f"SELECT position, {_ENTRY_COLUMNS} FROM entries "
+                f"WHERE position IN ({', '.join('?' * len(chunk))})", chunk):
+                found[row[0]] = _entry_from_row(row[1:])
+        return found
+
+
+class SqliteHeadwords(Mapping):
+    """Normalized headword -> HeadwordRecord, built per lookup"""
+
+    def __init__(self, conn: _Connections, count: int):
+        self._conn = conn
+        self._count = count
+
+    def get(self, key, default=None):
+        if not key:
+            return default
+        entries = [_entry_from_row(row) for row in self._conn().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE t_word_key = ? "
+            f"ORDER BY id, position", (key,))]
+        if not entries:
+            return default
+        return HeadwordRecord.from_entries(key, entries)
+
+    def __getitem__(self, key: str) -> HeadwordRecord:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key) -> bool:
+        return bool(key) and self._conn().execute(
+            "SELECT 1 FROM entries WHERE t_word_key = ? LIMIT 1",
+            (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # First-appearance order, like the in-memory index
+        for (key,) in self._conn().execute(
+            "SELECT t_word_key FROM entries WHERE t_word_key IS NOT NULL "
+            "GROUP BY t_word_key ORDER BY MIN(position)"):
+            yield key
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _SqlitePostings(Mapping):
+    """key -> entry positions, in the same order as the in-memory postings"""
+
+    def __init__(self, conn: _Connections, query: str, params: Tuple = ()):
+        self._conn = conn
+        self._query = query
+        self._params = params
+
+    def get(self, key, default=None):
+        positions = [position for (position,) in self._conn().execute(
+            self._query, (key, *self._params))]
+        return positions or default
+
+    def __getitem__(self, key: str) -> List[int]:
+        positions = self.get(key)
+        if positions is None:
+            raise KeyError(key)
+        return positions
+
+    def __iter__(self) -> Iterator[str]:
+        raise TypeError("SQLite postings cannot be iterated")
+
+    def __len__(self) -> int:
+        raise TypeError("SQLite postings have no cheap length")
+
+
+class SqlitePrefixIndex(PrefixIndex):
+    """PrefixIndex.iter_matches() over the prefix_keys table"""
+
+    def __init__(self, conn: _Connections):
+        self._conn = conn
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM prefix_keys").fetchone()[0]
+
+    def iter_matches(self, prefix: str, ranked: bool = True) -> Iterator[
+        Tuple[tuple, int]]:
+        if not prefix:
+            return
+        # Ties are broken by key then position, as in the sorted arrays
+        order = ("freq_rank, key_len, entry_id, key, position" if ranked
+                 else "key, position, freq_rank, key_len, entry_id")
+        seen = set()
+        for key, freq_rank, key_len, entry_id, position in self._conn().execute(
+            f"SELECT key, freq_rank, key_len, entry_id, position "
+            f"FROM prefix_keys WHERE key >= ? AND key < ? ORDER BY {order}",
+            (prefix, prefix + _MAX_CHAR)):
+            if position not in seen:
+                seen.add(position)
+                yield (freq_rank, key_len, entry_id), position
+
+
+class SqliteDictionaryIndex(DictionaryIndex):
+    """DictionaryIndex whose entries and indexes stay in the database"""
+
+    def __init__(self, db_path: Path, header: Dict[str, Any]):
+        conn = _Connections(db_path)
+        self.db_path = db_path
+        self._conn = conn
+        self.entries = SqliteEntries(conn, header["entry_count"])
+        self.headwords = SqliteHeadwords(conn, header["headword_count"])
+        self.fields = {
+            name: _SqlitePostings(
+                conn, "SELECT position FROM field_keys "
+                      "WHERE key = ? AND field = ? ORDER BY position", (name,))
+            for name in _INDEXED_FIELDS
+        }
+        self.english = _SqlitePostings(
+            conn, "SELECT position FROM english_keys WHERE key = ? ORDER BY "
+                  "freq_rank, field_rank, item_rank, entry_id, position")
+        self.prefixes = SqlitePrefixIndex(conn)
+        self._fuzzy = None
+
+    def __getstate__(self):
+        raise TypeError("SqliteDictionaryIndex is not picklable")
+
+    def close(self):
+        """
+        Release this thread's connection, e.g. after a reload swapped the
+        index out; lookups still running elsewhere keep theirs
+        """
+        self._conn.close()
+
+    def _sorted_entries(self, positions: Iterable[int]) -> List[
+        DictionaryEntry]:
+        found = self.entries.get_many(positions)
+        return [found[p] for p in
+                sorted(found, key=lambda p: (found[p].id, p))]
+
+    def search_definitions(self, query: str, limit: int = 20) -> SearchResult:
+        """
+        Full-text search over Thai definitions and sample sentences,
+        best (bm25) matches first
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return SearchResult(word=query, entries=[])
+        if len(normalized) >= _FTS_MIN_QUERY:
+            phrase = '"' + normalized.replace('"', '""') + '"'
+            rows = self._conn().execute(
+                "SELECT rowid FROM definitions WHERE definitions MATCH ? "
+                "ORDER BY rank LIMIT ?", (phrase, limit))
+        else:
+            pattern = "%" + normalized.replace("\\", "\\\\").replace(
+                "%", "\\%").replace("_", "\\_") + "%"
+            rows = self._conn().execute(
+                f"SELECT position FROM entries WHERE "
+                f"{' OR '.join(f'{c} LIKE ? ESCAPE ?' for c in _DEFINITION_COLUMNS)} "
+                f"ORDER BY position LIMIT ?",
+                (*[pattern, "\\"] * len(_DEFINITION_COLUMNS), limit))
+        positions = [position for (position,) in rows]
+        found = self.entries.get_many(positions)
+        return SearchResult(word=query, entries=[found[p] for p in positions])
+
+
+def load_sqlite_index(csv_path: str, csv_type: str = "auto") -> Tuple[
+    SqliteDictionaryIndex, Dict[str, Any]]:
+    """
+    Open the dictionary database, rebuilding it first when it is missing
+    or stale (same freshness rules as the pickle snapshots)
+    """
+    db_path = get_sqlite_path(csv_path, csv_type)
+    header = _read_header(db_path)
+    if header is None or not is_snapshot_fresh(
+        csv_path, csv_type, header, version=SQLITE_SCHEMA_VERSION):
+        print(f"Dictionary database missing or stale, rebuilding: {csv_path}")
+        header = build_database(csv_path, csv_type)
+    return SqliteDictionaryIndex(db_path, header), header
+
+
+if __name__ == "__main__":
+    for path in (settings.dict_file_freq, settings.dict_file_full,
+                 settings.dict_file_telex, settings.dict_file_lexitron):
+        start = time.perf_counter()
+        built = build_database(path)
+        print(f"{path}: {built['entry_count']} entries "
+              f"in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,362 @@
+"""
+Read-only merged dictionary in one memory-mapped file.
+
+Each worker process would otherwise unpickle every dictionary and build its
+own MergedIndex. A store file holds the finished merged index as flat
+arrays instead; workers map it read-only, so its pages live once in the OS
+page cache and are shared by every process on the host. Records are decoded
+from the mapping only when they are looked up.
+
+File layout (little-endian, sections 8-byte aligned):
+    header       magic, format version, counts, version, section offsets
+    meta         JSON: DictionaryEntry field names
+    strings      UTF-8 string pool, every distinct string stored once
+    string_refs  (offset, length) u32 pair per string id
+    entries      one string id per DictionaryEntry field, per entry
+    lists        u32 ids: translation string ids and entry numbers
+    records      key string id, translation start and count, entry start,
+                 then the entry count of every layer
+    slots        open-addressing hash table (crc32 of the key, linear
+                 probing) holding record number + 1, 0 for an empty slot
+
+Build the store ahead of time (it is also built on first use) with:
+    python -m utils.dict_store
+"""
+import dataclasses
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from models.dict_schemas import DictionaryEntry, MergedRecord, \
+    _INTERNED_FIELDS, _NUMERIC_FIELDS
+from utils.dict_index import MergedIndex
+from utils.dict_snapshot import SNAPSHOT_VERSION
+from utils.dict_util import normalize_query
+
+# Bump whenever the file layout or DictionaryEntry changes
+STORE_FORMAT_VERSION = 1
+
+_MAGIC = b"THDSTORE"
+_NONE = 0xFFFFFFFF
+_RECORD_FIXED = 4  # key, translation start, translation count, entry start
+# magic, format, layers, records, entries, strings, slots, version,
+# then offsets of meta, strings, string_refs, entries, lists, records, slots
+# and the end of the file
+_HEADER = struct.Struct("<8s6I16s8Q")
+
+_FIELD_NAMES = [f.name for f in dataclasses.fields(DictionaryEntry)]
+# Strings are stored as text; None means the value is used as it is
+_CONVERTERS = [sys.intern if name in _INTERNED_FIELDS else
+               _NUMERIC_FIELDS.get(name) for name in _FIELD_NAMES]
+
+
+def _check_byte_order():
+    # Sections are read back through memoryview.cast(), which is native-endian
+    if sys.byteorder != "little" or array("I").itemsize != 4:
+        raise RuntimeError("Dictionary store needs a little-endian platform "
+                           "with 4-byte unsigned ints")
+
+
+def get_store_path(sources: Sequence[Tuple[str, str]]) -> Path:
+    """
+    Store file for a list of (csv_path, csv_type) layers. The name is keyed
+    on the formats and each file's size and mtime, so a changed CSV maps to
+    a new store while workers still on the old one keep their mapping.
+    """
+    digest = hashlib.sha1(
+        f"{STORE_FORMAT_VERSION}:{SNAPSHOT_VERSION}".encode())
+    for csv_path, csv_type in sources:
+        stat = os.stat(csv_path)
+        digest.update(f"|{os.path.abspath(csv_path)}:{csv_type}:"
+                      f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return Path(settings.dict_snapshot_dir) / \
+        f"merged.{digest.hexdigest()[:16]}.store"
+
+
+class _StringPool:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.refs = array("I")
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, value) -> int:
+        if value is None:
+            return _NONE
+        if not isinstance(value, str):
+            value = repr(value)
+        sid = self.ids.get(value)
+        if sid is None:
+            data = value.encode("utf-8")
+            sid = len(self.ids)
+            self.ids[value] = sid
+            self.refs.extend((self.size, len(data)))
+            self.chunks.append(data)
+            self.size += len(data)
+        return sid
+
+
+def _aligned(f) -> int:
+    padding = -f.tell() % 8
+    f.write(b"\0" * padding)
+    return f.tell()
+
+
+def build_store(index: MergedIndex, path: Path, version: str) -> Path:
+    """Write a MergedIndex to a store file (atomically) and return its path"""
+    _check_byte_order()
+    keys = list(index.records)
+    layer_count = len(index.records[keys[0]].layers) if keys else 0
+
+    pool = _StringPool()
+    entry_count = 0  # Every entry belongs to exactly one headword
+    entries = array("I")
+    lists = array("I")
+    records = array("I")
+    for key in keys:
+        record = index.records[key]
+        translation_start = len(lists)
+        lists.extend(pool.add(t) for t in record.english_translations)
+        entry_start = len(lists)
+        counts = []
+        for layer in record.layers:
+            for entry in layer:
+                entries.extend(pool.add(getattr(entry, name))
+                               for name in _FIELD_NAMES)
+                lists.append(entry_count)
+                entry_count += 1
+            counts.append(len(layer))
+        records.extend((pool.add(key), translation_start,
+                        len(record.english_translations), entry_start,
+                        *counts))
+
+    capacity = 8
+    while capacity < 2 * len(keys):
+        capacity *= 2
+    slots = array("I", bytes(4 * capacity))
+    for number, key in enumerate(keys):
+        slot = zlib.crc32(key.encode("utf-8")) & (capacity - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (capacity - 1)
+        slots[slot] = number + 1
+
+    meta = json.dumps({"fields": _FIELD_NAMES}).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets = [_aligned(f)]
+        f.write(meta)
+        offsets.append(_aligned(f))
+        for chunk in pool.chunks:
+            f.write(chunk)
+        for section in (pool.refs, entries, lists, records, slots):
+            offsets.append(_aligned(f))
+            section.tofile(f)
+        offsets.append(f.tell())
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, STORE_FORMAT_VERSION, layer_count,
+                             len(keys), entry_count, len(pool.ids),
+                             capacity, version.encode("ascii")[:16],
+                             *offsets))
+    os.replace(tmp_path, path)
+    print(f"Dictionary store saved: {path} ({offsets[-1] / (1024 * 1024):.1f} MB)")
+    return path
+
+
+class MappedRecords(Mapping):
+    """
+    Read-only mapping of normalized headword -> MergedRecord over a store
+    file. Nothing is decoded until a key is looked up.
+    """
+
+    def __init__(self, path: Path):
+        _check_byte_order()
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _open(self):
+        (magic, file_format, self.layer_count, self.record_count,
+         self.entry_count, _, capacity, version, *offsets
+         ) = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC or file_format != STORE_FORMAT_VERSION:
+            raise ValueError(f"Not a current dictionary store: {self.path}")
+        meta_off, strings_off, refs_off, entries_off, lists_off, \
+            records_off, slots_off, end = offsets
+        meta = json.loads(self._mm[meta_off:strings_off].rstrip(b"\0"))
+        if meta["fields"] != _FIELD_NAMES:
+            raise ValueError(f"Dictionary store has stale fields: {self.path}")
+        self.version = version.rstrip(b"\0").decode("ascii")
+
+        # Zero-copy views: these only index into the shared mapping
+        view = memoryview(self._mm)
+        self._views = [view[start:stop].cast("I") for start, stop in (
+            (refs_off, entries_off), (entries_off, lists_off),
+            (lists_off, records_off), (records_off, slots_off),
+            (slots_off, slots_off + 4 * capacity))]
+        self._refs, self._entries, self._lists, self._records, self._slots = \
+            self._views
+        self._views.append(view)
+        self._strings_off = strings_off
+        self._record_width = _RECORD_FIXED + self.layer_count
+        self._mask = capacity - 1
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._mm.close()
+
+    def _bytes(self, sid: int) -> bytes:
+        start = self._strings_off + self._refs[2 * sid]
+        return self._mm[start:start + self._refs[2 * sid + 1]]
+
+    def _string(self, sid: int) -> Optional[str]:
+        if sid == _NONE:
+            return None
+        return self._bytes(sid).decode("utf-8")
+
+    def _find(self, key: str) -> int:
+        """Record number of a normalized key, -1 if missing"""
+        data = key.encode("utf-8")
+        slot = zlib.crc32(data) & self._mask
+        while True:
+            number = self._slots[slot]
+            if not number:
+                return -1
+            number -= 1
+            if self._bytes(self._records[number * self._record_width]) == data:
+                return number
+            slot = (slot + 1) & self._mask
+
+    def _entry(self, number: int) -> DictionaryEntry:
+        start = number * len(_FIELD_NAMES)
+        values = []
+        for sid, convert in zip(self._entries[start:start + len(_FIELD_NAMES)],
+                                _CONVERTERS):
+            value = self._string(sid)
+            if value is not None and convert is not None:
+                value = convert(value)
+            values.append(value)
+        return DictionaryEntry(*values)
+
+    def _translations(self, number: int) -> Tuple[str, ...]:
+        base = number * self._record_width
+        start, count = self._records[base + 1], self._records[base + 2]
+        return tuple(self._string(sid)
+                     for sid in self._lists[start:start + count])
+
+    def translations(self, key: str) -> Optional[Tuple[str, ...]]:
+        """Translations of a normalized key without decoding its entries"""
+        number = self._find(key) if key else -1
+        return self._translations(number) if number >= 0 else None
+
+    def _record(self, number: int) -> MergedRecord:
+        base = number * self._record_width
+        position = self._records[base + 3]
+        layers = []
+        for count in self._records[base + _RECORD_FIXED:
+                                   base + self._record_width]:
+            layers.append(tuple(self._entry(n) for n in
+                                self._lists[position:position + count]))
+            position += count
+        return MergedRecord(headword=self._string(self._records[base]),
+                            layers=tuple(layers),
+                            english_translations=self._translations(number))
+
+    def __getitem__(self, key: str) -> MergedRecord:
+        number = self._find(key) if key else -1
+        if number < 0:
+            raise KeyError(key)
+        return self._record(number)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and bool(key) and self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(self.record_count):
+            yield self._string(self._records[number * self._record_width])
+
+    def __len__(self) -> int:
+        return self.record_count
+
+
+class MappedDictionary(MergedIndex):
+    """
+    MergedIndex served from a shared store file instead of process memory.
+    Lookups, batch lookups and fuzzy lookups work unchanged on top of
+    MappedRecords; translations are read without decoding any entries.
+    """
+
+    def __init__(self, path: Path):
+        self.records = MappedRecords(path)
+        self.version = self.records.version
+        self._fuzzy = None
+
+    @property
+    def path(self) -> Path:
+        return self.records.path
+
+    def get_translations(self, word: str) -> Tuple[str, ...]:
+        return self.records.translations(normalize_query(word)) or ()
+
+    def get_translations_many(self, words: Iterable[str]) -> Dict[
+        str, Tuple[str, ...]]:
+        return {word: self.get_translations(word)
+                for word in dict.fromkeys(words)}
+
+    def close(self):
+        self.records.close()
+
+
+@contextmanager
+def store_lock():
+    """
+    Exclusive lock across processes for building, replacing and pruning
+    store files; mapping a finished store does not need it
+    """
+    directory = Path(settings.dict_snapshot_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "merged.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def remove_stale_stores(keep: Path):
+    """
+    Delete other store files; workers still mapping them are unaffected.
+    Call it holding store_lock(), so no other process is building one.
+    """
+    for path in keep.parent.glob("merged.*.store"):
+        if path != keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    from services.dictionary_service import dict_service_merged
+    settings.dict_shared_store = True
+    dict_service_merged.ensure_loaded()
+    print(f"{dict_service_merged.index.path}: {len(dict_service_merged.index)} "
+          f"headwords, version {dict_service_merged.version}")
@@ -1,5 +1,6 @@
 from collections import defaultdict
-from typing import Optional, Dict, List, Set
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, Iterator, List, Set
 import csv
 import unicodedata
 import re
@@ -17,21 +18,90 @@ _ENGLISH_FIELDS = {'e_dict', 'e_dict_v', 'e_related'}
 _THAI_FIELDS = {'t_word', 't_syn', 't_ant'}
 _SYNONYM_FIELDS = {'t_syn', 'e_related'}
 _ROMANIZATION_FIELDS = {'romanization'}
+_DEFAULT_FIELDS = {
+    't_word',  # Thai word (main field)
+    'e_dict',  # English dictionary meaning
+    'freq_english',  # Frequency list English
+    't_syn',  # Thai synonyms
+    'e_related'  # English related terms
+}
+# Fields holding comma-separated lists, matched item by item
+_LIST_FIELDS = {'t_syn', 'e_related'}
+# English fields for reverse (English -> Thai) lookup, best source first
+_REVERSE_ENGLISH_FIELDS = ('freq_english', 'e_dict', 'e_dict_v', 'rom_english',
+                           'e_related')
+_ENGLISH_LIST_RE = re.compile(r"[;,]")
+# Romanization fields for prefix search, e.g. "dāi [= dai]", "\dāi [= \dai]"
+_ROMAN_PREFIX_FIELDS = ('romanization', 'phonetic')
+_ROMAN_ALTERNATIVES_RE = re.compile(r"\[=|[\];,]")
+_ROMAN_STRIP_RE = re.compile(r"[^\w\s-]|\d|_")
+_THAI_CHAR_RE = re.compile(r"[\u0E00-\u0E7F]")
+# Distinct query strings kept normalized by normalize_query()
+_QUERY_CACHE_SIZE = 65536
+
+
+# Adapters for schemas read as plain positional rows, keyed by csv_type
+_POSITIONAL_ADAPTERS = {
+    "telex": DictionaryEntry.from_telex_csv_row,
+    "lexitron": DictionaryEntry.from_lexitron_csv_row,
+}
+
+
+def detect_csv_type(header: List[str]) -> str:
+    """Guess the dictionary schema from a CSV header row"""
+    if "freq_rank" in header:
+        return "freq"
+    if "e-search" in header:
+        return "lexitron"
+    if "t-search" in header:
+        return "telex"
+    return "full"
+
+
+def iter_dictionary_file(path: str, csv_type: str = "auto") -> Iterator[
+    DictionaryEntry]:
+    """
+    Stream DictionaryEntry objects from a CSV, one row at a time.
+    Telex and LEXiTRON rows are mapped by column position, without building
+    an intermediate dict per row.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:  # Handle BOM
+        header = next(csv.reader(f), None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        if csv_type == "auto":
+            csv_type = detect_csv_type(header)
+        yield from iter_csv_rows(f, header, csv_type)
+
+
+def iter_csv_rows(lines: Iterable[str], header: List[str],
+    csv_type: str) -> Iterator[DictionaryEntry]:
+    """
+    Parse the data rows of a dictionary CSV (everything after the header).
+    Also used on byte-range chunks of a file by the parallel loader.
+    """
+    adapter = _POSITIONAL_ADAPTERS.get(csv_type)
+    if adapter is not None:
+        columns = {name: position for position, name in enumerate(header)}
+        for row in csv.reader(lines):
+            if row:
+                yield adapter(row, columns)
+        return
+
+    if csv_type == "freq":
+        from_row = DictionaryEntry.from_frequency_csv_row
+    elif csv_type == "full":
+        from_row = DictionaryEntry.from_full_csv_row
+    else:
+        raise ValueError(f"Unknown dictionary csv_type: {csv_type}")
+    for row in csv.DictReader(lines, fieldnames=header):
+        yield from_row(row)
 
 
 def load_dictionary_from_file(path: str, csv_type: str = "auto") -> List[DictionaryEntry]:
     """Load the whole CSV into a list of DictionaryEntry objects"""
-    entries: List[DictionaryEntry] = []
-    with open(path, newline="", encoding="utf-8-sig") as f:  # Handle BOM
-        reader = csv.DictReader(f)
-        for row in reader:
-            if csv_type == "freq":
-                entries.append(DictionaryEntry.from_frequency_csv_row(row))
-            elif csv_type == "full":
-                entries.append(DictionaryEntry.from_full_csv_row(row))
-            else:  # auto-detect
-                entries.append(DictionaryEntry.from_row(row))
-    return entries
+    return list(iter_dictionary_file(path, csv_type))
 
 
 def normalize_text(text: Optional[str]) -> Optional[str]:
@@ -42,6 +112,21 @@ def normalize_text(text: Optional[str]) -> Optional[str]:
     if text is None:
         return None
 
+    if text.isascii() or not _ZW_RE.search(text):
+        # Same result as the full path when there is nothing to remove:
+        # str.split() strips and splits on exactly what \s matches
+        text = " ".join(text.split())
+    else:
+        return _normalize_text_full(text)
+
+    # Dictionary values and most tokens are already NFC; checking is cheap
+    if not text.isascii() and not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+
+    return text if text else None
+
+
+def _normalize_text_full(text: str) -> Optional[str]:
     # Strip regular + weird spaces (NBSP etc.)
     text = text.replace("\u00A0", " ").strip()
     text = _ZW_RE.sub("", text)  # Remove zero-width chars
@@ -65,6 +150,77 @@ def normalize_search_term(term: str) -> str:
     return normalized.lower() if normalized else ""
 
 
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def normalize_query(term: str) -> str:
+    """
+    normalize_search_term for lookups, memoized: subtitle tokens repeat a
+    lot within and across videos. Index builds call normalize_search_term
+    directly so they don't flush the memo.
+    """
+    return normalize_search_term(term)
+
+
+def split_english_terms(value: Optional[str]) -> List[str]:
+    """
+    Split an English gloss list such as "then ; subsequently ; so" into
+    case-folded lookup keys. A leading "to " is also indexed without it,
+    so "to eat" can be found as "eat".
+    """
+    if not value:
+        return []
+
+    keys = []
+    for term in _ENGLISH_LIST_RE.split(value):
+        key = normalize_english_key(term)
+        if not key:
+            continue
+        keys.append(key)
+        if key.startswith("to ") and len(key) > 3:
+            keys.append(key[3:])
+    return keys
+
+
+def normalize_english_key(term: Optional[str]) -> str:
+    """Normalize an English term for reverse lookup (case-folded)"""
+    normalized = normalize_text(term)
+    return normalized.casefold().strip(" .") if normalized else ""
+
+
+def fold_romanization(text: Optional[str]) -> str:
+    """
+    Fold a romanization to plain lowercase ASCII-ish letters so that typed
+    queries match: strips diacritics, tone marks and punctuation
+    ("dāi" -> "dai", "\\dāi" -> "dai")
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = _ROMAN_STRIP_RE.sub("", stripped.casefold())
+    return _WS_RE.sub(" ", stripped).strip()
+
+
+def split_romanizations(value: Optional[str]) -> List[str]:
+    """Split "dāi [= dai]" style values into folded alternatives"""
+    if not value:
+        return []
+    keys = []
+    for part in _ROMAN_ALTERNATIVES_RE.split(value):
+        key = fold_romanization(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def normalize_prefix_query(prefix: Optional[str]) -> str:
+    """Thai prefixes keep their marks, anything else is folded"""
+    if not prefix:
+        return ""
+    if _THAI_CHAR_RE.search(prefix):
+        return normalize_search_term(prefix)
+    return fold_romanization(prefix)
+
+
 def index_by_thai(entries: List[DictionaryEntry]) -> Dict[str, List[DictionaryEntry]]:
     """Build an index of Thai headwords for faster lookup"""
     buckets = defaultdict(dict)  # key -> {id: entry}
@@ -102,13 +258,7 @@ def search_dictionary(
 
     # Default search fields (most commonly searched)
     if search_fields is None:
-        search_fields = {
-            't_word',  # Thai word (main field)
-            'e_dict',  # English dictionary meaning
-            'freq_english',  # Frequency list English
-            't_syn',  # Thai synonyms
-            'e_related'  # English related terms
-        }
+        search_fields = _DEFAULT_FIELDS
 
     matching_entries = []
 
@@ -136,7 +286,7 @@ def _entry_matches_exact(
             continue
 
         # For synonyms and related terms, check each comma-separated item
-        if field_name in {'t_syn', 'e_related'}:
+        if field_name in _LIST_FIELDS:
             terms = [normalize_search_term(term.strip()) for term in
                      field_value.split(',')]
             if normalized_search in terms:
@@ -197,9 +347,10 @@ def search_with_priority(entries: List[DictionaryEntry],
         elif _entry_matches_exact(entry, normalized_search, _SYNONYM_FIELDS):
             synonym_matches.append(entry)
 
-    # Combine with headwords first, then synonyms
+    # Combine with headwords first, then synonyms, each group sorted by ID
+    headword_matches.sort(key=lambda x: x.id)
+    synonym_matches.sort(key=lambda x: x.id)
     all_matches = headword_matches + synonym_matches
-    all_matches.sort(key=lambda x: x.id)  # Secondary sort by ID
 
     return SearchResult(word=search_term, entries=all_matches)
 
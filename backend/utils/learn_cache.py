@@ -0,0 +1,277 @@
+"""
+Cache of finished learning results (process_video_for_learning output).
+
+Building a result re-reads both transcripts, re-aligns them and analyzes
+every word of every line. A cached result is stored as one JSON file per
+video in a "learning" directory inside the transcript cache, named by a
+hash of the video ID (the ID itself is stored and checked on read), with
+the inputs it was built from:
+    transcripts   path, size, mtime and SHA-1 of the Thai and English files
+    index         mtime of the transcript index.json
+    dictionary    merged dictionary version (a hash of the CSV contents)
+    engine        tokenizer, transliteration and fuzzy lookup settings
+
+A cached result is only served while all of those still match. Checking
+costs a few stat() calls: the index is re-read only when it changed, and a
+transcript is re-hashed only when its mtime changed, so a repeat request
+is at most one file read (none from the in-memory LRU in front).
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pythainlp
+
+from config.settings import settings
+from services.dictionary_service import get_dictionary_version
+from utils.dict_snapshot import file_sha1
+from utils.local_transcript_util import get_index_file_path, \
+    get_learning_dir, find_transcript_by_video_id
+from utils.transliteration_util import get_engine_id as \
+    get_transliteration_engine_id
+from utils.word_util import TOKENIZER_ENGINE
+
+# Bump whenever the learning result format changes
+LEARN_CACHE_VERSION = 2
+
+_LANGUAGES = ("Thai", "English")
+
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memory_lock = threading.Lock()
+# Held while recorded inputs are checked and refreshed in place, since
+# memory hits share them between threads
+_inputs_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale": 0}
+_stats_lock = threading.Lock()
+
+
+def get_learn_cache_dir() -> Path:
+    """
+    Directory of cached learning results, inside the transcript cache;
+    cleanup_old_files() expires them along with the transcripts
+    """
+    return get_learning_dir()
+
+
+def _cache_path(video_id: str) -> Path:
+    # Hashed, so no two IDs share a file however they are spelled
+    digest = hashlib.sha1(video_id.encode("utf-8")).hexdigest()
+    return get_learn_cache_dir() / f"{digest}.json"
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_engine_id() -> str:
+    """Everything besides the inputs that changes how words are analyzed"""
+    fuzzy = (f"{settings.dict_fuzzy_max_distance}/"
+             f"{settings.dict_fuzzy_min_length}"
+             if settings.dict_fuzzy_fallback else "off")
+    return (f"v{LEARN_CACHE_VERSION} pythainlp {pythainlp.__version__} "
+            f"tokenizer {TOKENIZER_ENGINE} "
+            f"transliteration {get_transliteration_engine_id()} "
+            f"fuzzy {fuzzy}")
+
+
+def _index_mtime_ns() -> Optional[int]:
+    try:
+        return os.stat(get_index_file_path()).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _transcript_paths(video_id: str) -> Optional[Dict[str, str]]:
+    paths = {}
+    for language in _LANGUAGES:
+        entry = find_transcript_by_video_id(video_id, language)
+        if entry is None:
+            return None
+        paths[language] = entry["file_path"]
+    return paths
+
+
+def collect_inputs(video_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Current inputs of a video's learning result, None if a transcript or
+    the dictionaries are missing (such results are not cached)
+    """
+    if not settings.learn_cache_enabled:
+        return None
+    version = get_dictionary_version()
+    index_mtime_ns = _index_mtime_ns()
+    paths = _transcript_paths(video_id)
+    if version is None or paths is None:
+        return None
+    transcripts = {}
+    try:
+        for language, path in paths.items():
+            stat = os.stat(path)
+            transcripts[language] = {
+                "path": path,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha1": file_sha1(path),
+            }
+    except OSError:
+        return None
+    return {
+        "transcripts": transcripts,
+        "index_mtime_ns": index_mtime_ns,
+        "dictionary_version": version,
+        "engine": get_engine_id(),
+    }
+
+
+def _is_fresh(video_id: str, inputs: Dict[str, Any]) -> bool:
+    """
+    Check recorded inputs against the current ones, refreshing recorded
+    mtimes in place when only a timestamp changed
+    """
+    with _inputs_lock:
+        return _check_inputs(video_id, inputs)
+
+
+def _check_inputs(video_id: str, inputs: Dict[str, Any]) -> bool:
+    if inputs.get("dictionary_version") != get_dictionary_version():
+        return False
+    if inputs.get("engine") != get_engine_id():
+        return False
+
+    transcripts = inputs.get("transcripts", {})
+    index_mtime_ns = _index_mtime_ns()
+    if inputs.get("index_mtime_ns") != index_mtime_ns:
+        # Some transcript was saved; still fine if ours are the same files
+        paths = _transcript_paths(video_id)
+        if paths != {language: transcripts.get(language, {}).get("path")
+                     for language in _LANGUAGES}:
+            return False
+        inputs["index_mtime_ns"] = index_mtime_ns
+
+    for recorded in transcripts.values():
+        try:
+            stat = os.stat(recorded["path"])
+        except OSError:
+            return False
+        if stat.st_size != recorded["size"]:
+            return False
+        if stat.st_mtime_ns != recorded["mtime_ns"]:
+            if file_sha1(recorded["path"]) != recorded["sha1"]:
+                return False
+            recorded["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def _remember(video_id: str, cached: Dict[str, Any]):
+    with _memory_lock:
+        _memory[video_id] = cached
+        _memory.move_to_end(video_id)
+        while len(_memory) > settings.learn_cache_memory_items:
+            _memory.popitem(last=False)
+
+
+def get_cached_result(video_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Cached learning result of a video if all of its inputs are unchanged.
+    The result is shared between callers and must not be modified.
+    """
+    # Nothing can be validated before the dictionaries are loaded
+    if not settings.learn_cache_enabled or get_dictionary_version() is None:
+        return None
+
+    with _memory_lock:
+        cached = _memory.get(video_id)
+        if cached is not None:
+            _memory.move_to_end(video_id)
+    source = "memory_hits"
+    if cached is None:
+        source = "disk_hits"
+        try:
+            with open(_cache_path(video_id), encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            _count("misses")
+            return None
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable learning cache for {video_id}: {e}")
+            _count("misses")
+            return None
+        if cached.get("video_id") != video_id:
+            # Written by an older version, or not ours
+            _count("misses")
+            return None
+
+    if not _is_fresh(video_id, cached.get("inputs", {})):
+        with _memory_lock:
+            _memory.pop(video_id, None)
+        _count("stale")
+        return None
+
+    _count(source)
+    if source == "disk_hits":
+        _remember(video_id, cached)
+    return cached["result"]
+
+
+def store_result(video_id: str, inputs: Optional[Dict[str, Any]],
+    result: Dict[str, Any]):
+    """
+    Cache a successful learning result built from inputs (collected with
+    collect_inputs() before building it, so a transcript that changed
+    meanwhile makes the entry stale rather than wrong)
+    """
+    if not settings.learn_cache_enabled or inputs is None:
+        return
+    if not result.get("success"):
+        return
+
+    data = json.dumps({"video_id": video_id, "inputs": inputs,
+                       "result": result}, ensure_ascii=False)
+    path = _cache_path(video_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so readers never see a partial result
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Warning: Failed to save learning cache for {video_id}: {e}")
+    # A private copy in the same form as a result read back from disk
+    _remember(video_id, json.loads(data))
+
+
+def clear_learn_cache() -> int:
+    """Drop every cached learning result. Returns the number of files deleted."""
+    with _memory_lock:
+        _memory.clear()
+    deleted = 0
+    for path in get_learn_cache_dir().glob("*.json"):
+        try:
+            path.unlink()
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def get_learn_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and sizes, for the cache stats endpoint"""
+    cache_dir = get_learn_cache_dir()
+    files = list(cache_dir.glob("*.json")) if cache_dir.exists() else []
+    with _memory_lock:
+        memory_items = len(_memory)
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        **stats,
+        "memory_items": memory_items,
+        "files": len(files),
+        "size_bytes": sum(path.stat().st_size for path in files),
+        "engine": get_engine_id(),
+    }
@@ -14,6 +14,11 @@ def get_temp_dir() -> Path:
     return Path(settings.transcript_temp_dir)
 
 
+def get_learning_dir() -> Path:
+    """Get the directory of cached learning results (utils/learn_cache.py)"""
+    return get_temp_dir() / "learning"
+
+
 def get_index_file_path() -> Path:
     """Get the path to the index file"""
     return get_temp_dir() / "index.json"
@@ -382,8 +387,8 @@ def _load_transcript_from_directory(video_id: str, language: str = None) -> \
 def cleanup_old_files(days_to_keep: int = None) -> int:
     """
     Clean up transcript files older than specified days.
-    Also cleans up the index.
-    Returns the number of files deleted.
+    Also cleans up the index and cached learning results written before
+    the cutoff. Returns the number of files deleted.
     """
     if days_to_keep is None:
         days_to_keep = settings.transcript_retention_days
@@ -416,12 +421,27 @@ def cleanup_old_files(days_to_keep: int = None) -> int:
                 except ValueError:
                     continue  # Skip directories that don't match date format
 
+        # Clean up cached learning results, and temp files left behind by
+        # interrupted writes
+        learning_deleted = 0
+        learning_dir = get_learning_dir()
+        if learning_dir.is_dir():
+            cutoff_time = cutoff_date.timestamp()
+            for file_path in learning_dir.iterdir():
+                if (file_path.is_file()
+                    and (file_path.suffix == '.json' or '.tmp' in file_path.name)
+                    and file_path.stat().st_mtime < cutoff_time):
+                    file_path.unlink()
+                    learning_deleted += 1
+        deleted_count += learning_deleted
+
         # Clean up stale index entries
         index_cleaned = cleanup_index()
 
         if deleted_count > 0:
             print(
-                f"Cleaned up {deleted_count} old transcript files and {index_cleaned} stale index entries")
+                f"Cleaned up {deleted_count} old transcript files "
+                f"({learning_deleted} learning results) and {index_cleaned} stale index entries")
 
         return deleted_count
 
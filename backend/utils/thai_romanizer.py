@@ -0,0 +1,579 @@
+"""
+Table-driven Thai romanization with tone accents (e.g. ไม่ -> mâi).
+
+Pure Python with no ICU or model data, so it loads instantly. Of the
+engines that spell out pronunciation it is the fast one (about 8x royin on
+the frequency list); icu and iso_11940 are faster but transcribe letter by
+letter. Registered as the "romanizer" transliteration engine; set
+transliteration_engine=romanizer to use it for word analysis.
+
+Grew out of the transliterate_thai prototype in the repository's test.py.
+A syllable is read as [pre vowel] initial [vowel and tone marks] [final]:
+    - the tone comes from the initial's class (high, mid or low) and the
+      tone mark, or without a mark from the class and whether the
+      syllable is live or dead
+    - initials are single consonants, r/l/w clusters (ครับ, ปลุก), silent
+      ห/อ leads that only set the class (ไหม, อยู่) or pairs with a silent
+      ร (จริง, สร้าง)
+    - a run of consonants without vowels is read with implicit vowels,
+      pairs as -o- syllables from the end and a leftover first consonant
+      as -a (คน -> khon, ถนน -> thà nǒn); a high or mid consonant read with
+      implicit -a lends its class to a following sonorant (สวัสดี -> sà wàt)
+    - ๆ repeats the preceding Thai run; digits and Latin text pass through
+Words that no spelling rule covers (ก็, น้ำ, the linking syllable of วิทยา)
+are read from IRREGULAR, also inside longer words.
+
+Spelling: aspirated kh ph th ch, unaspirated g bp dt j; long vowels are
+doubled (aa ii uu ee oo uee) except ae, or and er; tones are marked on the
+first vowel letter (à low, â falling, á high, ǎ rising).
+
+Words in the override dictionary (OVERRIDES, plus the JSON object in
+settings.romanizer_overrides_file) are returned as given. The expected
+outputs in data/romanizer_golden.tsv come from the frequency dictionary's
+IPA transcriptions (see benchmarks.romanizer) or were checked by hand, never
+from this module. Check them from the backend directory with:
+    python -m utils.thai_romanizer
+"""
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+
+# Bump whenever the rules change the output of any word
+ROMANIZER_VERSION = 2
+
+GOLDEN_CORPUS_PATH = Path(__file__).resolve().parent.parent / "data" / \
+    "romanizer_golden.tsv"
+
+# Per-word house style, e.g. "สถานการณ์": "sà-tǎa-ná-gaan"
+OVERRIDES: Dict[str, str] = {}
+
+# Readings the spelling rules cannot derive; matched inside words too
+IRREGULAR: Dict[str, str] = {
+    "ก็": "gôr",
+    "น้ำ": "náam",
+    "วิทยา": "wít thá yaa",
+    "เหตุ": "hèet",
+    "ศาสตร์": "sàat",
+    "สามารถ": "sǎa mâat",
+    "สถานการณ์": "sà thǎan ná gaan",
+}
+
+MAI_EK = "่"
+MAI_THO = "้"
+MAI_TRI = "๊"
+MAI_CHATTAWA = "๋"
+TONE_MARKS = frozenset(MAI_EK + MAI_THO + MAI_TRI + MAI_CHATTAWA)
+THANTHAKHAT = "์"
+MAI_TAIKHU = "็"
+MAI_HAN_AKAT = "ั"
+MAI_YAMOK = "ๆ"
+
+CONS = frozenset("กขฃคฅฆงจฉชซฌญฎฏฐฑฒณดตถทธนบปผฝพฟภมยรลวศษสหฬฮอ")
+PRE_VOWELS = frozenset("เแโไใ")
+# Vowel signs written after, above or below the initial
+VOWEL_SIGNS = frozenset("ะาำิีึืุูๅ" + MAI_HAN_AKAT + MAI_TAIKHU)
+HIGH = frozenset("ขฃฉฐถผฝศษสห")
+MID = frozenset("กจฎฏดตบปอ")
+# A consonant followed by one of these is the initial of a syllable
+_MARKS = VOWEL_SIGNS | TONE_MARKS
+# Low sonorants: ห before these is silent and only changes the tone class,
+# and a high or mid consonant with implicit -a lends its class to them
+_SONORANTS = frozenset("งญณนมยรลวฬ")
+_CLUSTERS = frozenset(("กร", "ขร", "คร", "ตร", "ปร", "พร", "กล", "ขล", "คล",
+                       "ปล", "ผล", "พล", "กว", "ขว", "คว"))
+# ร after these is silent
+_SILENT_R = frozenset(("จร", "ซร", "ศร", "สร"))
+# Final ต/ธ whose written -ิ/-ุ is not pronounced after a long vowel (ชาติ)
+_SILENT_VOWEL_FINALS = frozenset("ตธ")
+_LIVE_FINALS = frozenset(("m", "n", "ng", "y", "w"))
+
+INIT_MAP = {
+    "ก": "g", "ข": "kh", "ฃ": "kh", "ค": "kh", "ฅ": "kh", "ฆ": "kh",
+    "ง": "ng", "จ": "j", "ฉ": "ch", "ช": "ch", "ซ": "s", "ฌ": "ch",
+    "ญ": "y", "ฎ": "d", "ฏ": "dt", "ฐ": "th", "ฑ": "th", "ฒ": "th",
+    "ถ": "th", "ท": "th", "ธ": "th", "ด": "d", "ต": "dt",
+    "ณ": "n", "น": "n", "บ": "b", "ป": "bp",
+    "ผ": "ph", "พ": "ph", "ภ": "ph", "ฝ": "f", "ฟ": "f",
+    "ม": "m", "ย": "y", "ร": "r", "ล": "l", "ว": "w",
+    "ศ": "s", "ษ": "s", "ส": "s", "ห": "h", "ฬ": "l", "ฮ": "h", "อ": "",
+}
+
+CODA_MAP = {
+    **{c: "k" for c in "กขฃคฅฆ"},
+    **{c: "t" for c in "ดฎตฏจชซฌศษสฐฑฒถทธ"},
+    **{c: "p" for c in "บปพฟภผฝ"},
+    "ง": "ng", "น": "n", "ณ": "n", "ญ": "n", "ร": "n", "ล": "n", "ฬ": "n",
+    "ม": "m", "ย": "y", "ว": "w", "อ": "", "ห": "", "ฮ": "",
+}
+
+# Tone of a syllable with a tone mark, by the initial's class
+_MARKED_TONES = {
+    ("M", MAI_EK): "L", ("H", MAI_EK): "L", ("L", MAI_EK): "F",
+    ("M", MAI_THO): "F", ("H", MAI_THO): "F", ("L", MAI_THO): "H",
+    ("M", MAI_TRI): "H", ("H", MAI_TRI): "H", ("L", MAI_TRI): "H",
+    ("M", MAI_CHATTAWA): "R", ("H", MAI_CHATTAWA): "R",
+    ("L", MAI_CHATTAWA): "R",
+}
+
+_TONE_ACCENTS = {"L": "̀", "H": "́", "R": "̌", "F": "̂"}
+
+# Vowel followed by a y/w final, spelled as one vowel
+_GLIDES = {
+    ("a", "y"): "ai", ("aa", "y"): "aai", ("or", "y"): "oi",
+    ("er", "y"): "oei", ("oo", "y"): "ooi", ("u", "y"): "ui",
+    ("uu", "y"): "uui", ("a", "w"): "ao", ("aa", "w"): "aao",
+    ("i", "w"): "iu", ("ii", "w"): "iu", ("e", "w"): "eo", ("ee", "w"): "eeo",
+    ("ia", "w"): "iao",
+}
+
+# Consonant (and vowel) + thanthakhat is silent (การณ์ -> การ, ศักดิ์ -> ศัก)
+_SILENT_RE = re.compile(r"[ก-ฮ][ิุ]?" + THANTHAKHAT)
+# Thai letters and marks (without ๆ) | ๆ | whitespace | anything else
+_TOKEN_RE = re.compile(r"([ก-ๅ็-๎]+)|(" + MAI_YAMOK +
+                       r")|(\s+)|([^฀-๿\s]+)")
+_THAI_DIGITS = str.maketrans("๐๑๒๓๔๕๖๗๘๙", "0123456789")
+
+# Syllable: (initial, tone class, vowel, is short, tone mark, final)
+Syllable = Tuple[str, str, str, bool, str, str]
+
+_overrides: Optional[Dict[str, str]] = None
+
+
+def preprocess(text: str) -> str:
+    return _SILENT_RE.sub("", text).translate(_THAI_DIGITS)
+
+
+_IRREGULAR_RE = re.compile("|".join(
+    re.escape(preprocess(word))
+    for word in sorted(IRREGULAR, key=len, reverse=True)))
+_IRREGULAR = {preprocess(word): reading for word, reading in IRREGULAR.items()}
+
+
+def get_overrides() -> Dict[str, str]:
+    """OVERRIDES merged with the overrides file from settings (loaded once)"""
+    global _overrides
+    if _overrides is None:
+        overrides = dict(OVERRIDES)
+        path = settings.romanizer_overrides_file
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    overrides.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring romanizer overrides {path}: {e}")
+        _overrides = overrides
+    return _overrides
+
+
+def set_overrides(overrides: Dict[str, str]):
+    """Replace the override dictionary (OVERRIDES and file are not re-read)"""
+    global _overrides
+    _overrides = dict(overrides)
+
+
+def get_romanizer_version() -> str:
+    """Rules version plus a digest of the overrides, for cache keys"""
+    overrides = get_overrides()
+    if not overrides:
+        return f"v{ROMANIZER_VERSION}"
+    digest = hashlib.sha1(json.dumps(overrides, sort_keys=True,
+                                     ensure_ascii=False).encode("utf-8"))
+    return f"v{ROMANIZER_VERSION} overrides {digest.hexdigest()[:12]}"
+
+
+def cons_class(ch: str) -> str:
+    if ch in HIGH:
+        return "H"
+    if ch in MID:
+        return "M"
+    return "L"
+
+
+def calc_tone(tone_class: str, tone_mark: str, is_short: bool,
+    live: bool) -> str:
+    """Tone (M, L, F, H or R) from the class × tone mark / live-dead rules"""
+    if tone_mark:
+        return _MARKED_TONES[(tone_class, tone_mark)]
+    if live:
+        return "R" if tone_class == "H" else "M"
+    if tone_class == "L":
+        return "H" if is_short else "F"
+    return "L"
+
+
+@lru_cache(maxsize=8192)
+def spell_syllable(initial: str, vowel: str, final: str, tone: str) -> str:
+    """Romanized syllable with the tone accent on its first vowel letter"""
+    rhyme = _GLIDES.get((vowel, final))
+    if rhyme is None:
+        rhyme = vowel + final
+    if tone in _TONE_ACCENTS:
+        # NFC turns base letter + combining accent into à, á, ǎ, â, ...
+        rhyme = unicodedata.normalize("NFC", rhyme[0] + _TONE_ACCENTS[tone]) \
+            + rhyme[1:]
+    return initial + rhyme
+
+
+def romanize_syllable(syllable: Syllable) -> str:
+    initial, tone_class, vowel, is_short, tone_mark, final = syllable
+    live = final in _LIVE_FINALS or (not final and not is_short)
+    return spell_syllable(initial, vowel, final,
+                          calc_tone(tone_class, tone_mark, is_short, live))
+
+
+def _initial(s: str, i: int, pre: str = "", clusters: bool = True) -> Tuple[
+    str, str, int]:
+    """Romanized initial, tone class and number of letters at s[i]"""
+    ch = s[i]
+    pair = s[i:i + 2]
+    if clusters and len(pair) == 2 and pair[1] in CONS \
+            and s[i + 1:i + 3] != "รร":
+        after = s[i + 2] if i + 2 < len(s) else ""
+        # Without a pre vowel, a pair at the end of a consonant run is
+        # initial and final (ผล); ว is a vowel unless a mark follows (ขวด)
+        if pre or after in _MARKS or (after in CONS and pair[1] != "ว"):
+            if ch == "ห" and pair[1] in _SONORANTS:
+                return INIT_MAP[pair[1]], "H", 2
+            if pair == "อย":
+                return "y", "M", 2
+            if pair in _SILENT_R:
+                return INIT_MAP[ch], cons_class(ch), 2
+            if pair == "ทร":
+                return "s", "L", 2
+            if pair in _CLUSTERS:
+                return INIT_MAP[ch] + INIT_MAP[pair[1]], cons_class(ch), 2
+    return INIT_MAP[ch], cons_class(ch), 1
+
+
+def _vowel_follows(s: str, i: int) -> bool:
+    """Whether the letters at s[i] (after an initial) spell a vowel"""
+    n = len(s)
+    if i >= n:
+        return False
+    if s[i] in _MARKS:
+        return True
+    if s[i] == "อ":
+        # ◌อ, unless อ starts a syllable of its own (อย่า, ไออุ่น, ออก)
+        return not (i + 1 < n and (s[i + 1] in _MARKS or s[i + 1] == "อ" or (
+            s[i + 1] == "ย" and i + 2 < n and s[i + 2] in _MARKS)))
+    if s[i] == "ว":
+        # ◌ว◌ (สวย, ควร), but not ว before รร (สวรรค์)
+        return i + 1 < n and s[i + 1] in CONS and not (
+            i + 2 < n and s[i + 2] in _MARKS) and s[i + 1:i + 3] != "รร"
+    return s[i:i + 2] == "รร"
+
+
+def _starts_syllable(s: str, i: int) -> bool:
+    """Whether the consonant at s[i] is an initial rather than a final"""
+    if s[i] not in CONS:
+        return False
+    _, _, size = _initial(s, i)
+    return _vowel_follows(s, i + size)
+
+
+def _letters_run(s: str, i: int, clusters: bool) -> List[Tuple[int, int]]:
+    run = []
+    while i < len(s) and s[i] in CONS and not _starts_syllable(s, i):
+        size = _initial(s, i, clusters=clusters)[2]
+        run.append((i, size))
+        i += size
+    return run
+
+
+def _consonant_run(s: str, i: int) -> List[Tuple[int, int]]:
+    """
+    (start, letters) of each consonant, or cluster, from s[i] up to the
+    next initial that carries a written vowel
+    """
+    run = _letters_run(s, i, True)
+    if len(run) % 2 == 1:
+        # Pairs of single letters read better than an unpaired cluster
+        # (ตกลง -> dtòk long, not dtà glong)
+        letters = _letters_run(s, i, False)
+        if len(letters) % 2 == 0 and any(
+                s[start:start + size] in _CLUSTERS for start, size in run):
+            return letters
+    return run
+
+
+def _read_syllable(s: str, i: int, lead_class: str = "",
+    pre: Optional[str] = None) -> Tuple[Syllable, int]:
+    """
+    Syllable with a written vowel starting at s[i], and where it ends.
+    pre is a pre vowel written before an earlier consonant (เฉพาะ).
+    """
+    n = len(s)
+    if pre is None:
+        pre = s[i] if s[i] in PRE_VOWELS else ""
+        i += bool(pre)
+    initial, tone_class, size = _initial(s, i, pre)
+    tone_class = lead_class or tone_class
+    i += size
+
+    marks = ""
+    tone_mark = ""
+    while i < n and s[i] in _MARKS:
+        if s[i] in TONE_MARKS:
+            tone_mark = s[i]
+        else:
+            marks += s[i]
+        i += 1
+    nxt = s[i] if i < n else ""
+    glide = nxt in CONS and not _starts_syllable(s, i)
+
+    # Vowel, whether it is short and whether it can take a final
+    closed = True
+    final = ""
+    if pre == "เ":
+        if "ี" in marks and nxt == "ย":
+            vowel, short, i = "ia", False, i + 1
+        elif "ื" in marks and nxt == "อ":
+            vowel, short, i = "uea", False, i + 1
+        elif "า" in marks:
+            vowel, short, closed = ("or", True, False) if "ะ" in marks \
+                else ("ao", False, False)
+        elif "ะ" in marks:
+            vowel, short, closed = "e", True, False
+        elif MAI_TAIKHU in marks:
+            vowel, short = "e", True
+        elif "ิ" in marks:
+            vowel, short = "er", False
+        elif "ี" in marks:
+            vowel, short = "ee", False
+        elif nxt == "อ" and glide:
+            vowel, short, closed, i = "er", False, False, i + 1
+            if i < n and s[i] == "ะ":
+                short, i = True, i + 1
+        elif nxt == "ย" and glide:
+            vowel, short, closed, final, i = "er", False, False, "y", i + 1
+        else:
+            # Closed เ◌ with a tone mark is short (เล่น), otherwise long
+            vowel, short = "ee", False
+            if tone_mark in (MAI_EK, MAI_THO) and glide:
+                vowel, short = "e", True
+    elif pre == "แ":
+        vowel, short = "ae", "ะ" in marks or MAI_TAIKHU in marks
+        closed = "ะ" not in marks
+    elif pre == "โ":
+        vowel, short = ("o", True) if "ะ" in marks else ("oo", False)
+        closed = "ะ" not in marks
+    elif pre:
+        vowel, short, closed = "ai", False, False
+        if nxt == "ย" and glide:
+            i += 1  # ไทย
+    elif MAI_HAN_AKAT in marks:
+        if nxt == "ว" and glide:
+            vowel, short, closed, i = "ua", False, False, i + 1
+        elif nxt == "ย" and glide:
+            vowel, short, closed, i = "ai", False, False, i + 1
+        else:
+            vowel, short = "a", True
+    elif "ำ" in marks:
+        vowel, short, closed = "am", False, False
+    elif "ะ" in marks:
+        vowel, short, closed = "a", True, False
+    elif "า" in marks or "ๅ" in marks:
+        vowel, short = "aa", False
+    elif "ิ" in marks:
+        vowel, short = "i", True
+    elif "ี" in marks:
+        vowel, short = "ii", False
+    elif "ึ" in marks:
+        vowel, short = "ue", True
+    elif "ื" in marks:
+        vowel, short = "uee", False
+        if nxt == "อ" and glide:
+            closed, i = False, i + 1
+    elif "ุ" in marks:
+        vowel, short = "u", True
+    elif "ู" in marks:
+        vowel, short = "uu", False
+    elif nxt == "อ" and glide:
+        vowel, short, i = "or", False, i + 1
+    elif nxt == "ว" and glide:
+        vowel, short, i = "ua", False, i + 1
+    elif s[i:i + 2] == "รร":
+        vowel, short, i = "a", True, i + 2
+        final = "n"
+    else:
+        vowel, short = ("or", True) if MAI_TAIKHU in marks else ("o", True)
+
+    if closed and i < n and s[i] in CONS:
+        # Of the consonants before the next written vowel, pairs are read
+        # from the end as -o- syllables (ชาชน), so an odd one out closes
+        # this syllable
+        run = _consonant_run(s, i)
+        end = run[-1][0] + run[-1][1] if run else i
+        if len(run) % 2 == 1:
+            final, i = CODA_MAP.get(s[i], ""), i + 1
+        elif len(run) == 2 and s[run[1][0]] == "ร" and vowel in (
+            "a", "i", "u", "e", "ee"):
+            # ร after a final is silent (จักร, มิตร, เพชร)
+            final, i = CODA_MAP.get(s[i], ""), end
+        elif run and end < n and s[end] in _SONORANTS and \
+                _initial(s, end)[2] == 1:
+            # Before a sonorant with a written vowel, the first is the final
+            # and the next one gets implicit -a (สนับสนุน, โรงพยาบาล)
+            final, i = CODA_MAP.get(s[i], ""), i + 1
+        elif not run and s[i] in _SILENT_VOWEL_FINALS and \
+                s[i + 1:i + 2] in ("ิ", "ุ") and i + 2 == n and \
+                vowel in ("aa", "a", "ee", "ia"):
+            final, i = CODA_MAP.get(s[i], ""), n
+    if vowel in ("ai", "am", "ao"):
+        short = False  # Live like a long vowel
+    return (initial, tone_class, vowel, short, tone_mark, final), i
+
+
+def _leads_pre_vowel(s: str, i: int) -> bool:
+    """Whether a high or mid consonant at s[i], after เ, only has -a"""
+    if _initial(s, i, "เ")[2] > 1 or cons_class(s[i]) == "L" or \
+            s[i + 1:i + 2] not in CONS or s[i + 1] == "อ":
+        return False
+    vowel = s[i + 2:i + 3]
+    if vowel in TONE_MARKS:
+        vowel = s[i + 3:i + 4]
+    return vowel in ("อ", "็", "ิ", "ี", "ื") or s[i + 2:i + 4] == "าะ"
+
+
+def split_syllables(s: str) -> List[Syllable]:
+    """Syllables of a run of Thai letters (no digits, spaces or ๆ)"""
+    out: List[Syllable] = []
+    i, n = 0, len(s)
+    lead_class = ""
+    while i < n:
+        if s[i] not in CONS and s[i] not in PRE_VOWELS:
+            # Marks without a consonant to carry them are dropped
+            i += 1
+            continue
+        if s[i] in PRE_VOWELS:
+            if i + 1 < n and s[i + 1] in CONS:
+                pre = s[i]
+                if pre == "เ" and _leads_pre_vowel(s, i + 1):
+                    # เฉพาะ, เสมอ: the pre vowel belongs to the second
+                    # consonant, the first is read with implicit -a
+                    initial, tone_class, _ = _initial(s, i + 1)
+                    out.append((initial, lead_class or tone_class, "a",
+                                True, "", ""))
+                    lead_class = tone_class \
+                        if s[i + 2] in _SONORANTS else ""
+                    syllable, i = _read_syllable(s, i + 2, lead_class, pre)
+                else:
+                    syllable, i = _read_syllable(s, i, lead_class)
+                out.append(syllable)
+            else:
+                i += 1
+            lead_class = ""
+            continue
+
+        run = _consonant_run(s, i)
+        j = run[-1][0] + run[-1][1] if run else i
+
+        for position, (start, size) in enumerate(run):
+            if (len(run) - position) % 2 == 1 and position == 0:
+                # Leftover first consonant: implicit -a
+                initial, tone_class, _ = _initial(s, start, clusters=size > 1)
+                out.append((initial, lead_class or tone_class, "a", True, "",
+                            ""))
+                lead_class = tone_class if size == 1 and tone_class != "L" \
+                    else ""
+            elif (len(run) - position) % 2 == 0:
+                # Pair: implicit -o- with the next consonant as final,
+                # -or- before a final ร (นคร)
+                initial, tone_class, _ = _initial(s, start, clusters=size > 1)
+                if lead_class and (size > 1 or s[start] not in _SONORANTS):
+                    lead_class = ""
+                final = s[run[position + 1][0]]
+                vowel, short = ("or", False) if final == "ร" else ("o", True)
+                out.append((initial, lead_class or tone_class, vowel, short,
+                            "", CODA_MAP.get(final, "")))
+                lead_class = ""
+        i = j
+        if i < n and s[i] in CONS:
+            if lead_class and (_initial(s, i)[2] > 1
+                               or s[i] not in _SONORANTS):
+                lead_class = ""
+            syllable, i = _read_syllable(s, i, lead_class)
+            out.append(syllable)
+        lead_class = ""
+    return out
+
+
+def _romanize_run(run: str) -> List[str]:
+    """Romanized syllables of a run of Thai letters"""
+    out = []
+    position = 0
+    for match in _IRREGULAR_RE.finditer(run):
+        out.extend(romanize_syllable(syllable) for syllable in
+                   split_syllables(run[position:match.start()]))
+        out.append(_IRREGULAR[match.group()])
+        position = match.end()
+    out.extend(romanize_syllable(syllable)
+               for syllable in split_syllables(run[position:]))
+    return out
+
+
+def romanize(text: str) -> str:
+    """Romanize Thai text; syllables are separated by spaces"""
+    overrides = get_overrides()
+    if text in overrides:
+        return overrides[text]
+    out = []
+    previous: List[str] = []
+    for thai, yamok, _, other in _TOKEN_RE.findall(preprocess(text)):
+        if thai:
+            previous = _romanize_run(thai)
+            out.extend(previous)
+        elif yamok:
+            # ๆ repeats the word before it
+            out.extend(previous)
+        elif other:
+            out.append(other)
+            previous = []
+    return " ".join(out)
+
+
+def romanize_words(words: Iterable[str]) -> List[str]:
+    """Romanize many words, each distinct word once"""
+    words = list(words)
+    romanized = {word: romanize(word) for word in dict.fromkeys(words)}
+    return [romanized[word] for word in words]
+
+
+def read_golden_corpus(path: Path = GOLDEN_CORPUS_PATH) -> List[
+    Tuple[str, str]]:
+    """(word, expected romanization) pairs from word<TAB>expected<TAB>source"""
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line and not line.startswith("#"):
+                word, expected, _ = line.split("\t")
+                pairs.append((word, expected))
+    return pairs
+
+
+def check_golden_corpus(path: Path = GOLDEN_CORPUS_PATH) -> List[
+    Tuple[str, str, str]]:
+    """(word, expected, actual) for every word romanized differently"""
+    pairs = read_golden_corpus(path)
+    actual = romanize_words(word for word, _ in pairs)
+    return [(word, expected, result)
+            for (word, expected), result in zip(pairs, actual)
+            if result != expected]
+
+
+if __name__ == "__main__":
+    set_overrides({})
+    mismatches = check_golden_corpus()
+    for word, expected, result in mismatches:
+        print(f"  {word}: expected {expected!r}, got {result!r}")
+    total = len(read_golden_corpus())
+    print(f"{total - len(mismatches)}/{total} golden words match")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,224 @@
+"""
+Registry of transliteration engines for the "transliterated" field of
+analyzed words.
+
+The analysis pipeline uses settings.transliteration_engine; endpoints can
+ask for another engine per request. Each engine has its own bounded cache.
+Engines backed by optional packages (icu, tltk, epitran) are listed even when
+the package cannot be imported, but report themselves as unavailable and
+refuse to run. If the configured engine cannot run, word analysis falls
+back to the bundled pure-Python romanizer with a warning.
+More engines can be added with register_engine().
+
+Compare engines with:
+    python -m benchmarks.transliteration
+"""
+import importlib
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from pythainlp.transliterate import romanize, transliterate
+
+from config.settings import settings
+from utils.cache_util import ShardedLRUCache
+from utils.thai_romanizer import romanize as romanize_thai, romanize_words, \
+    get_romanizer_version
+
+
+@dataclass(frozen=True)
+class TransliterationEngine:
+    name: str
+    transliterate: Callable[[str], str]
+    description: str = ""
+    # Module an optional dependency must provide for the engine to work
+    requires: Optional[str] = None
+    # Faster than one call per word, if the engine has it
+    transliterate_many: Optional[Callable[[List[str]], List[str]]] = None
+    # Changes whenever the engine's output may change (e.g. its data)
+    version: Optional[Callable[[], str]] = None
+
+
+_engines: Dict[str, TransliterationEngine] = {}
+_caches: Dict[str, ShardedLRUCache] = {}
+_caches_lock = threading.Lock()
+_available: Dict[str, bool] = {}
+# Engine for word analysis when the configured one cannot run; pure Python
+FALLBACK_ENGINE = "romanizer"
+# Resolved default engine, reset when engines are registered
+_default_engine: Optional[str] = None
+
+
+def register_engine(name: str, transliterate_word: Callable[[str], str],
+    description: str = "", requires: Optional[str] = None,
+    transliterate_many: Optional[Callable[[List[str]], List[str]]] = None,
+    version: Optional[Callable[[], str]] = None):
+    """Add (or replace) an engine under name"""
+    global _default_engine
+    _engines[name] = TransliterationEngine(name, transliterate_word,
+                                           description, requires,
+                                           transliterate_many, version)
+    _available.pop(name, None)
+    _default_engine = None
+    with _caches_lock:
+        _caches.pop(name, None)
+
+
+register_engine("icu", partial(transliterate, engine="icu"),
+                "ICU Thai-Latin, Latin script with diacritics", "icu")
+register_engine("iso_11940", partial(transliterate, engine="iso_11940"),
+                "ISO 11940 letter-by-letter Latin script")
+register_engine("royin", partial(romanize, engine="royin"),
+                "Royal Thai General System, plain ASCII without tones")
+register_engine("tltk_g2p", partial(transliterate, engine="tltk_g2p"),
+                "TLTK grapheme-to-phoneme, syllables with tone numbers", "tltk")
+register_engine("tltk_ipa", partial(transliterate, engine="tltk_ipa"),
+                "TLTK International Phonetic Alphabet", "tltk")
+register_engine("ipa", partial(transliterate, engine="ipa"),
+                "Epitran International Phonetic Alphabet", "epitran")
+register_engine("romanizer", romanize_thai,
+                "Table-driven romanization with tone accents, pure Python",
+                transliterate_many=romanize_words,
+                version=get_romanizer_version)
+
+
+def get_default_engine() -> str:
+    """
+    Engine used for word analysis: the one from settings, or the fallback
+    if that one is unknown or its package cannot be imported
+    """
+    global _default_engine
+    if _default_engine is None:
+        name = settings.transliteration_engine
+        if not is_engine_available(name):
+            print(f"Warning: Transliteration engine '{name}' is unknown or "
+                  f"unavailable, analyzing words with '{FALLBACK_ENGINE}'")
+            name = FALLBACK_ENGINE
+        _default_engine = name
+    return _default_engine
+
+
+def get_engine_id(name: Optional[str] = None) -> str:
+    """Engine name plus its version, if it has one, for cache keys"""
+    engine = get_engine(name)
+    return f"{engine.name} {engine.version()}" if engine.version \
+        else engine.name
+
+
+def _can_import(module: str) -> bool:
+    # find_spec() is not enough: PyICU installs fine without libicu, and
+    # only fails once its extension module is loaded
+    try:
+        importlib.import_module(module)
+    except ModuleNotFoundError:
+        return False  # Not installed
+    except Exception as e:
+        print(f"Warning: Cannot import '{module}': {e}")
+        return False
+    return True
+
+
+def is_engine_available(name: str) -> bool:
+    """Whether the engine is registered and its dependency can be imported"""
+    engine = _engines.get(name)
+    if engine is None:
+        return False
+    if name not in _available:
+        _available[name] = engine.requires is None or \
+            _can_import(engine.requires)
+    return _available[name]
+
+
+def get_engine(name: Optional[str] = None) -> TransliterationEngine:
+    """Registered engine by name (default engine if None)"""
+    name = name or get_default_engine()
+    if name not in _engines:
+        raise ValueError(f"Unknown transliteration engine '{name}', "
+                         f"expected one of {', '.join(_engines)}")
+    if not is_engine_available(name):
+        raise ValueError(f"Transliteration engine '{name}' needs the "
+                         f"'{_engines[name].requires}' package")
+    return _engines[name]
+
+
+def check_default_engine() -> str:
+    """Resolve the default engine now, so a fallback is logged at startup"""
+    return get_default_engine()
+
+
+def _cache(name: str) -> ShardedLRUCache:
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(name, ShardedLRUCache(
+                settings.word_cache_size, settings.word_cache_shards,
+                settings.word_cache_ttl_seconds))
+    return cache
+
+
+def transliterate_word(word: str, engine: Optional[str] = None) -> str:
+    """Cached transliteration of a word with the given (or default) engine"""
+    name = engine or get_default_engine()
+    cache = _cache(name)
+    transliterated = cache.get(word)
+    if transliterated is None:
+        transliterated = get_engine(name).transliterate(word)
+        cache.set(word, transliterated)
+    return transliterated
+
+
+def transliterate_words(words: List[str],
+    engine: Optional[str] = None) -> List[str]:
+    """Cached transliterations of many words, misses in one engine batch"""
+    name = engine or get_default_engine()
+    cache = _cache(name)
+    results = [cache.get(word) for word in words]
+    missing = list(dict.fromkeys(word for word, result in zip(words, results)
+                                 if result is None))
+    if missing:
+        engine_impl = get_engine(name)
+        if engine_impl.transliterate_many is not None:
+            transliterated = engine_impl.transliterate_many(missing)
+        else:
+            transliterated = [engine_impl.transliterate(word)
+                              for word in missing]
+        found = dict(zip(missing, transliterated))
+        for word, value in found.items():
+            cache.set(word, value)
+        results = [found[word] if result is None else result
+                   for word, result in zip(words, results)]
+    return results
+
+
+def remember_transliteration(word: str, transliterated: str,
+    engine: Optional[str] = None):
+    """Put a known transliteration (e.g. from the word store) in the cache"""
+    _cache(engine or get_default_engine()).set(word, transliterated)
+
+
+def warm_up_transliteration(engine: Optional[str] = None):
+    """Load an engine's data ahead of the first real word"""
+    get_engine(engine).transliterate("สวัสดี")
+
+
+def clear_transliteration_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+
+
+def get_transliteration_stats() -> Dict[str, Dict[str, Any]]:
+    """Cache counters per engine that has been used"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def list_engines() -> List[Dict[str, Any]]:
+    default = get_default_engine()
+    return [{"name": engine.name,
+             "description": engine.description,
+             "available": is_engine_available(engine.name),
+             "default": engine.name == default}
+            for engine in _engines.values()]
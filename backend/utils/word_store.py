@@ -0,0 +1,206 @@
+"""
+Persistent store of analyzed words, shared by processes and restarts.
+
+Every process starts with empty in-memory word caches, and analyzing a word
+means an ICU transliteration plus dictionary lookups. Analyzed words are
+also written to one SQLite database next to the dictionary snapshots:
+
+    words   (version, word) -> transliteration and JSON list of translations
+
+The database runs in WAL mode, so any number of server and learn worker
+processes read it concurrently while one of them writes. Rows are keyed by
+an analysis version (dictionary version plus engine settings, built by
+utils.word_util) so a reload or an engine change never serves old results.
+Processes on different versions may share the database, so a version's rows
+are only pruned once no process has used it for word_store_max_age_days:
+
+    versions  version -> last time a process wrote or seeded from it
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from config.settings import settings
+from models.dict_schemas import TokenizedThaiWord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    version TEXT NOT NULL,
+    word TEXT NOT NULL,
+    transliterated TEXT NOT NULL,
+    english_translations TEXT NOT NULL,
+    PRIMARY KEY (version, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS versions (
+    version TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Stay below SQLite's limit on bound parameters
+_LOOKUP_CHUNK = 500
+
+# sqlite3 connections are per-thread
+_local = threading.local()
+_disabled = False
+_stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def get_word_store_path() -> Path:
+    return Path(settings.dict_snapshot_dir) / "words.sqlite"
+
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _connection() -> Optional[sqlite3.Connection]:
+    global _disabled
+    if _disabled or not settings.word_store_enabled:
+        return None
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        try:
+            path = get_word_store_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            # E.g. a read-only data directory; keep analyzing without it
+            print(f"Warning: Word store unavailable, not persisting words: {e}")
+            _disabled = True
+            return None
+        _local.conn = conn
+    return conn
+
+
+def _word_from_row(row) -> TokenizedThaiWord:
+    return TokenizedThaiWord(thai=row[0], transliterated=row[1],
+                             english_translations=json.loads(row[2]))
+
+
+def load_words(version: str, words: Iterable[str]) -> Dict[
+    str, TokenizedThaiWord]:
+    """Stored analyses of the given words (those that have one)"""
+    conn = _connection()
+    words = list(words)
+    if conn is None or not words:
+        return {}
+    found = {}
+    try:
+        for start in range(0, len(words), _LOOKUP_CHUNK):
+            chunk = words[start:start + _LOOKUP_CHUNK]
+            rows = conn.execute(
+                "SELECT word, transliterated, english_translations FROM words "
+                f"WHERE version = ? AND word IN ({', '.join('?' * len(chunk))})",
+                [version, *chunk])
+            for row in rows:
+                found[row[0]] = _word_from_row(row)
+    except sqlite3.Error as e:
+        _count("errors")
+        print(f"Warning: Word store lookup failed: {e}")
+        return {}
+    _count("hits", len(found))
+    _count("misses", len(words) - len(found))
+    return found
+
+
+def _mark_used(conn: sqlite3.Connection, version: str):
+    conn.execute("INSERT OR REPLACE INTO versions VALUES (?, ?)",
+                 (version, time.time()))
+
+
+def save_words(version: str, results: Iterable[TokenizedThaiWord]):
+    """Store analyses in one transaction; failures only cost the caching"""
+    conn = _connection()
+    rows = [(version, result.thai, result.transliterated,
+             json.dumps(result.english_translations, ensure_ascii=False))
+            for result in results]
+    if conn is None or not rows:
+        return
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO words VALUES (?, ?, ?, ?)", rows)
+            _mark_used(conn, version)
+    except sqlite3.Error as e:
+        # E.g. another process held the write lock for too long
+        _count("errors")
+        print(f"Warning: Failed to save {len(rows)} words to the word store: {e}")
+        return
+    _count("writes", len(rows))
+
+
+def iter_stored_words(version: str, limit: int) -> Iterator[TokenizedThaiWord]:
+    """Up to limit stored analyses of a version, for pre-seeding caches"""
+    conn = _connection()
+    if conn is None:
+        return
+    try:
+        rows = conn.execute(
+            "SELECT word, transliterated, english_translations FROM words "
+            "WHERE version = ? LIMIT ?", (version, limit)).fetchall()
+    except sqlite3.Error as e:
+        _count("errors")
+        print(f"Warning: Failed to read the word store: {e}")
+        return
+    for row in rows:
+        yield _word_from_row(row)
+
+
+def prune_word_store(version: str, max_age_seconds: float) -> int:
+    """
+    Mark version as in use and delete analyses of the versions no process
+    has used for max_age_seconds. Returns the rows deleted.
+    """
+    conn = _connection()
+    if conn is None:
+        return 0
+    cutoff = time.time() - max_age_seconds
+    try:
+        with conn:
+            _mark_used(conn, version)
+            deleted = conn.execute(
+                "DELETE FROM words WHERE version NOT IN "
+                "(SELECT version FROM versions WHERE last_used >= ?)",
+                (cutoff,)).rowcount
+            conn.execute("DELETE FROM versions WHERE last_used < ?", (cutoff,))
+    except sqlite3.Error as e:
+        _count("errors")
+        print(f"Warning: Failed to prune the word store: {e}")
+        return 0
+    return deleted
+
+
+def get_word_store_stats() -> Dict[str, Any]:
+    """Row counts and this process's hit/miss counters"""
+    path = get_word_store_path()
+    with _stats_lock:
+        counters = dict(_stats)
+    stats: Dict[str, Any] = {
+        "enabled": settings.word_store_enabled and not _disabled,
+        "path": str(path),
+        **counters,
+    }
+    conn = _connection()
+    if conn is None:
+        return stats
+    try:
+        stats["words"] = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        stats["versions"] = conn.execute(
+            "SELECT COUNT(DISTINCT version) FROM words").fetchone()[0]
+        stats["size_bytes"] = sum(
+            p.stat().st_size for p in path.parent.glob(f"{path.name}*"))
+    except (OSError, sqlite3.Error) as e:
+        # E.g. the database is locked; the counters above are still useful
+        _count("errors")
+        stats["errors"] += 1
+        print(f"Warning: Failed to read word store stats: {e}")
+    return stats
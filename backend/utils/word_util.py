@@ -1,82 +1,159 @@
 # utils/word_util.py - Optimized version
 
-from pythainlp import transliterate
-from models.dict_schemas import TokenizedThaiWord
-from services.dictionary_service import DictionaryService
-from functools import lru_cache
-from typing import List, Dict, Optional
-
-# Global cache for word processing results
-_word_cache: Dict[str, TokenizedThaiWord] = {}
-
+import threading
 
-@lru_cache(maxsize=10000)
-def _cached_transliterate(word: str) -> str:
-    """Cached transliteration to avoid repeated calls"""
-    return transliterate(word, engine="icu")
+import pythainlp
+from config.settings import settings
+from models.dict_schemas import TokenizedThaiWord
+from services.dictionary_service import DictionaryService, \
+    MergedDictionaryService, dict_service_merged, get_dictionary_version
+from utils.cache_util import ShardedLRUCache
+from utils.transliteration_util import transliterate_words, \
+    remember_transliteration, clear_transliteration_caches, \
+    get_transliteration_stats, get_engine_id
+from utils.word_store import load_words, save_words, iter_stored_words, \
+    prune_word_store, get_word_store_stats
+from typing import Any, List, Dict, Hashable, Optional, Union
+
+# Anything with get_translations() / get_translations_many() /
+# get_fuzzy_translations()
+Dictionary = Union[DictionaryService, MergedDictionaryService]
+
+# pythainlp tokenizer behind every analyzed word; cached learning results
+# are only reused with the same one (and transliteration engine)
+TOKENIZER_ENGINE = "newmm"
+
+# Word processing results, shared by request threads
+_word_cache = ShardedLRUCache(settings.word_cache_size,
+                              settings.word_cache_shards,
+                              settings.word_cache_ttl_seconds)
+# Dictionary version the caches were filled from
+_cache_version: Optional[str] = None
+_cache_version_lock = threading.Lock()
+
+
+def get_analysis_version() -> Optional[str]:
+    """
+    Everything an analyzed word depends on (stored words are keyed by it),
+    None until the dictionaries are loaded
+    """
+    dictionary_version = get_dictionary_version()
+    if dictionary_version is None:
+        return None
+    fuzzy = (f"{settings.dict_fuzzy_max_distance}/"
+             f"{settings.dict_fuzzy_min_length}"
+             if settings.dict_fuzzy_fallback else "off")
+    return (f"{dictionary_version} pythainlp {pythainlp.__version__} "
+            f"transliteration {get_engine_id()} fuzzy {fuzzy}")
+
+
+def seed_word_cache(prune: bool = False) -> int:
+    """
+    Fill the in-memory caches from the word store, e.g. at startup.
+    With prune, first drop stored words of dictionary or engine versions
+    that no process has used for settings.word_store_max_age_days.
+    Returns the number of words loaded.
+    """
+    version = get_analysis_version()
+    if version is None:
+        return 0
+    _check_cache_version()
+    if prune:
+        pruned = prune_word_store(
+            version, settings.word_store_max_age_days * 86400)
+        if pruned:
+            print(f"Pruned {pruned} outdated words from the word store")
+    count = 0
+    for result in iter_stored_words(version, settings.word_cache_size):
+        _word_cache.set(result.thai, result)
+        remember_transliteration(result.thai, result.transliterated)
+        count += 1
+    return count
+
+
+def _check_cache_version():
+    """Drop cached results once the dictionaries have been reloaded"""
+    global _cache_version
+    version = get_dictionary_version()
+    if version == _cache_version:
+        return
+    with _cache_version_lock:
+        # Another thread may have cleared it for this version meanwhile
+        if version != _cache_version:
+            # Only translations depend on the dictionaries
+            _word_cache.clear()
+            _cache_version = version
+
+
+def _cache_key(dictionary: Dictionary, word: str) -> Hashable:
+    """
+    Words analyzed with the merged dictionary are cached under themselves,
+    with any other dictionary under that dictionary and its load version
+    """
+    if dictionary is dict_service_merged:
+        return word
+    return id(dictionary), dictionary.version, word
 
 
 def process_thai_word(word: str,
-    dict_service_freq: DictionaryService,
-    dict_service_full: Optional[DictionaryService] = None) -> TokenizedThaiWord:
-    """Process a single Thai word into a TokenizedThaiWord with caching"""
-
-    # Check cache first
-    if word in _word_cache:
-        return _word_cache[word]
-
-    # Get transliteration (cached)
-    transliterated = _cached_transliterate(word)
+    dictionary: Optional[Dictionary] = None) -> TokenizedThaiWord:
+    """
+    Process a single Thai word into a TokenizedThaiWord with caching.
+    Uses the merged freq/full dictionary unless another one is given.
+    Prefer process_thai_words_batch() for several words: it reads and
+    writes the word store once for all of them.
+    """
+    return process_thai_words_batch(dictionary, [word])[0]
 
-    # Search for English translations using the service
-    search_result = dict_service_freq.search_word(word)
-    english_translations = search_result.get_english_translations() if search_result else []
 
-    if len(english_translations) == 0 and dict_service_full is not None:
-        search_result = dict_service_full.search_word(word)
-        english_translations = search_result.get_english_translations() if search_result else []
-
-    # Create result
-    result = TokenizedThaiWord(
-        thai=word,
-        transliterated=transliterated,
-        english_translations=english_translations
-    )
-
-    # Cache the result
-    _word_cache[word] = result
-
-    return result
-
-
-def process_thai_words_batch(dict_service: DictionaryService,
+def process_thai_words_batch(dict_service: Optional[Dictionary],
     words: List[str]) -> List[TokenizedThaiWord]:
     """Process multiple Thai words efficiently with batch operations"""
 
+    _check_cache_version()
+    if dict_service is None:
+        dict_service = dict_service_merged
     results = []
-    uncached_words = []
-    word_to_index = {}
+    # Uncached word -> every position it appears at
+    word_to_indices: Dict[str, List[int]] = {}
 
     # First pass: check cache and collect uncached words
     for i, word in enumerate(words):
-        if word in _word_cache:
-            results.append(_word_cache[word])
+        cached = _word_cache.get(_cache_key(dict_service, word))
+        if cached is not None:
+            results.append(cached)
         else:
             # Mark as needing processing
             results.append(None)
-            uncached_words.append(word)
-            word_to_index[word] = i
+            word_to_indices.setdefault(word, []).append(i)
+    uncached_words = list(word_to_indices)
+
+    # Then the store shared with other processes and earlier runs
+    version = get_analysis_version() if dict_service is dict_service_merged \
+        else None
+    if version is not None and uncached_words:
+        for word, stored in load_words(version, uncached_words).items():
+            _word_cache.set(_cache_key(dict_service, word), stored)
+            for i in word_to_indices.pop(word):
+                results[i] = stored
+        uncached_words = list(word_to_indices)
 
     # Batch process uncached words
     if uncached_words:
+        processed_words = []
         # Batch transliteration
-        transliterations = {word: _cached_transliterate(word) for word in
-                            uncached_words}
+        transliterations = dict(zip(uncached_words,
+                                    transliterate_words(uncached_words)))
 
-        # Batch dictionary lookups (if your dictionary service supports it)
+        # Batch dictionary lookup, one pass over the index
+        translations = dict_service.get_translations_many(uncached_words)
         for word in uncached_words:
-            search_result = dict_service.search_word(word)
-            english_translations = search_result.get_english_translations() if search_result else []
+            english_translations = translations[word]
+            # Last resort: nearest headword, for tone-mark/vowel variants and typos
+            if (len(english_translations) == 0
+                and settings.dict_fuzzy_fallback
+                and len(word) >= settings.dict_fuzzy_min_length):
+                english_translations = dict_service.get_fuzzy_translations(word)
 
             # Create result
             processed_word = TokenizedThaiWord(
@@ -86,21 +163,30 @@ def process_thai_words_batch(dict_service: DictionaryService,
             )
 
             # Cache and store
-            _word_cache[word] = processed_word
-            results[word_to_index[word]] = processed_word
+            _word_cache.set(_cache_key(dict_service, word), processed_word)
+            processed_words.append(processed_word)
+            for i in word_to_indices[word]:
+                results[i] = processed_word
+
+        if version is not None:
+            save_words(version, processed_words)
 
     return results
 
 
 def clear_word_cache():
-    """Clear the word processing cache"""
-    global _word_cache
+    """Clear the word processing and transliteration caches"""
     _word_cache.clear()
+    clear_transliteration_caches()
 
 
-def get_cache_stats():
-    """Get cache statistics for debugging"""
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Size and hit/miss/eviction counters of this process's word caches,
+    and of the persistent word store behind them
+    """
     return {
-        "cache_size": len(_word_cache),
-        "cached_words": list(_word_cache.keys())[:10]  # First 10
+        "words": _word_cache.stats(),
+        "transliterations": get_transliteration_stats(),
+        "store": get_word_store_stats(),
     }